@@ -3,50 +3,81 @@ Main entry point for the Elite Web Scraping application
 """
 import argparse
 import asyncio
+import atexit
 import csv
 import logging
+import logging.handlers
+import mmap
+import queue
+import re
 import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List, Union
 
 from src.config import Config
-from src.core.proxy_manager import ProxyManager, ProxyType
-from src.pipelines.data_pipeline import DataPipeline
 
-# Configure logging - prevent duplicates
-root_logger = logging.getLogger()
-
-# Remove all existing handlers to prevent duplicates
-for handler in root_logger.handlers[:]:
-    root_logger.removeHandler(handler)
-    try:
-        handler.close()
-    except Exception:
-        pass
+logger = logging.getLogger(__name__)
 
-# Create a single handler
-if Config.LOG_FILE:
-    handler = logging.FileHandler(Config.LOG_FILE)
-else:
-    handler = logging.StreamHandler(sys.stdout)
+# Set once logging has been configured, so repeated main() calls are no-ops
+_LOGGING_INITIALIZED = False
 
-# Configure formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
 
-# Configure logging with force=True to replace any existing configuration
-logging.basicConfig(
-    level=getattr(logging, Config.LOG_LEVEL.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[handler],
-    force=True  # Python 3.8+: force reconfiguration
-)
+def _configure_logging() -> None:
+    """
+    Configure root logging (single handler, no duplicates)
+    
+    Called from main() rather than at import time, so importing this module
+    has no side effects on other handlers. Records are put on a queue and
+    formatted and written by a QueueListener thread, so logging from the
+    scraping coroutines never blocks the event loop on stdout or the log file.
+    """
+    global _LOGGING_INITIALIZED
+    if _LOGGING_INITIALIZED:
+        return
+    
+    root_logger = logging.getLogger()
+    
+    # Remove all existing handlers to prevent duplicates
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        try:
+            handler.close()
+        except Exception:
+            pass
+    
+    # Create a single handler
+    if Config.LOG_FILE:
+        handler = logging.FileHandler(Config.LOG_FILE)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    
+    # Configure formatter
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    
+    # The writing handler is served by a background thread; the root logger only enqueues
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    # Flush the records still queued when the process exits (including sys.exit)
+    atexit.register(listener.stop)
+    
+    # Existing handlers were removed above, so this is the only root handler
+    root_logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper()))
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _LOGGING_INITIALIZED = True
 
-logger = logging.getLogger(__name__)
 
 # Default search URL
 DEFAULT_SEARCH_URL = "https://www.zapimoveis.com.br/venda/"
 
+# Listing URL validation patterns (compiled once, used for every CSV row)
+_LISTING_URL_RE = re.compile(r'zapimoveis\.com\.br.*/imovel/')
+_SEARCH_URL_RE = re.compile(r'/(?:venda|aluguel)/|/(?:busca|pesquisa)')
+
+# Indicator values that count as "not filled"
+_FALSY_VALUES = frozenset(('', 'none', 'null', 'false'))
+
 
 def is_listing_url(url: str) -> bool:
     """
@@ -61,23 +92,21 @@ def is_listing_url(url: str) -> bool:
     if not url or not isinstance(url, str):
         return False
     
-    url = url.strip().lower()
-    
-    # Must be from zapimoveis.com.br
-    if 'zapimoveis.com.br' not in url:
-        return False
-    
-    # Must contain /imovel/ to be a listing page
-    if '/imovel/' not in url:
-        return False
-    
-    # Must NOT be a search page (venda/, aluguel/, etc.)
-    search_indicators = ['/venda/', '/aluguel/', '/busca', '/pesquisa']
-    for indicator in search_indicators:
-        if indicator in url:
-            return False
+    return _is_normalized_listing_url(url.strip().lower())
+
+
+def _is_normalized_listing_url(url_lower: str) -> bool:
+    """
+    Same check as is_listing_url for a URL that is already stripped and lowercased
     
-    return True
+    Args:
+        url_lower: Stripped, lowercase URL
+        
+    Returns:
+        True if URL is a listing individual page, False otherwise
+    """
+    # Must be a zapimoveis.com.br /imovel/ page and NOT a search page (venda/, aluguel/, etc.)
+    return bool(_LISTING_URL_RE.search(url_lower)) and not _SEARCH_URL_RE.search(url_lower)
 
 
 def discover_search_urls() -> List[str]:
@@ -94,38 +123,52 @@ def discover_search_urls() -> List[str]:
     return base_search_urls
 
 
-def _count_filled_indicators(row: Dict[str, str], indicators: List[str]) -> int:
+def _iter_csv_records(buffer: mmap.mmap) -> Iterator[List[Union[bytes, str]]]:
     """
-    Counts how many deep search indicators are filled in a row.
+    Yields CSV records from a memory-mapped file, locating line breaks with mmap.find().
+    
+    Records without quotes are split on commas and returned as raw bytes fields,
+    so only the cells that are actually read get decoded. Records containing a
+    quote are extended until their quotes balance (quoted cells may span lines)
+    and parsed with csv.reader, returning str fields.
     
     Args:
-        row: CSV row dictionary
-        indicators: List of indicator field names
+        buffer: Memory-mapped CSV file opened for reading
         
-    Returns:
-        Number of filled indicators
-    """
-    filled_count = 0
-    for indicator in indicators:
-        value = row.get(indicator, '').strip()
-        if value and value.lower() not in ['', 'none', 'null', 'false']:
-            filled_count += 1
-    return filled_count
-
-
-def _needs_deep_search(row: Dict[str, str], indicators: List[str]) -> bool:
+    Yields:
+        List of fields (bytes for the fast path, str for quoted records)
     """
-    Checks if a row needs deep search based on filled indicators.
+    size = len(buffer)
+    pos = 0
     
-    Args:
-        row: CSV row dictionary
-        indicators: List of deep search indicator field names
+    while pos < size:
+        end = buffer.find(b'\n', pos)
+        if end == -1:
+            end = size
+        line = buffer[pos:end]
         
-    Returns:
-        True if row needs deep search (less than 2 indicators filled)
-    """
-    filled_count = _count_filled_indicators(row, indicators)
-    return filled_count < 2
+        if b'"' in line:
+            # Quoted cell may contain newlines - extend until quotes are balanced
+            while line.count(b'"') % 2 and end < size:
+                end = buffer.find(b'\n', end + 1)
+                if end == -1:
+                    end = size
+                line = buffer[pos:end]
+            record = line.rstrip(b'\r').decode('utf-8')
+            yield next(csv.reader([record]), [])
+        else:
+            line = line.rstrip(b'\r')
+            yield line.split(b',') if line else []
+        
+        pos = end + 1
+
+
+def _cell(row: List[Union[bytes, str]], index: int) -> str:
+    """Returns a record field as str, decoding raw bytes fields on demand"""
+    if index >= len(row):
+        return ''
+    value = row[index]
+    return value.decode('utf-8') if isinstance(value, bytes) else value
 
 
 def get_missing_deep_search_urls(csv_path: Path) -> List[str]:
@@ -143,8 +186,11 @@ def get_missing_deep_search_urls(csv_path: Path) -> List[str]:
         logger.warning(f"CSV file not found: {csv_path}")
         return []
     
-    missing_urls = []
-    invalid_urls = []
+    # Ordered set: incremental runs can leave several rows for the same URL
+    missing_urls: Dict[str, None] = {}
+    # Only the count is reported, plus a few examples for debugging
+    invalid_count = 0
+    invalid_sample: List[str] = []
     
     # Fields that indicate deep search was completed
     deep_search_indicators = [
@@ -162,39 +208,83 @@ def get_missing_deep_search_urls(csv_path: Path) -> List[str]:
     ]
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        if csv_path.stat().st_size == 0:
+            logger.warning(f"CSV file is empty: {csv_path}")
+            return []
+        
+        with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Scan the mapped file and decode only the url and indicator cells of each row
+            records = _iter_csv_records(buffer)
+            first_record = next(records, [])
+            header = [_cell(first_record, i).strip() for i in range(len(first_record))]
+            if not header or 'url' not in header:
+                logger.warning(f"CSV file has no 'url' column: {csv_path}")
+                return []
+            
+            url_idx = header.index('url')
+            indicator_idx = [header.index(name) for name in deep_search_indicators if name in header]
             total_rows = 0
             
-            for row in reader:
+            for row in records:
+                if not row:
+                    continue
                 total_rows += 1
-                url = row.get('url', '').strip()
+                url = _cell(row, url_idx).strip()
                 
                 if not url:
                     continue
                 
-                if not is_listing_url(url):
-                    invalid_urls.append(url)
+                # url is already stripped, only lowercase it once for validation
+                if not _is_normalized_listing_url(url.lower()):
+                    invalid_count += 1
+                    if len(invalid_sample) < 10:
+                        invalid_sample.append(url)
                     logger.debug(f"Skipping invalid URL (not a listing page): {url}")
                     continue
                 
-                filled_count = _count_filled_indicators(row, deep_search_indicators)
-                if filled_count < 2:
-                    missing_urls.append(url)
+                # Empty cells (the common case) are skipped before lowercasing
+                filled_count = sum(
+                    1 for i in indicator_idx
+                    if (value := _cell(row, i).strip()) and value.lower() not in _FALSY_VALUES
+                )
+                if filled_count < 2 and url not in missing_urls:
+                    missing_urls[url] = None
                     logger.debug(f"URL needs deep search: {url} (filled indicators: {filled_count})")
         
         logger.info(f"Read {total_rows} rows from CSV")
         logger.info(f"Found {len(missing_urls)} valid listing URLs that need deep search")
-        if invalid_urls:
-            logger.warning(f"Skipped {len(invalid_urls)} invalid URLs (search pages or invalid format)")
+        if invalid_count:
+            logger.warning(f"Skipped {invalid_count} invalid URLs (search pages or invalid format)")
+            logger.debug(f"Sample of skipped URLs: {invalid_sample}")
         
-        return missing_urls
+        return list(missing_urls)
         
     except Exception as e:
         logger.error(f"Error reading CSV file {csv_path}: {e}", exc_info=True)
         return []
 
 
+async def _compact_csv_journal(csv_path: Path) -> None:
+    """
+    Fold journaled single-listing saves into the CSV before it is scanned
+    
+    An unclean exit can leave deep search results in the journal that never
+    reached the CSV; without this they would be scraped again.
+    
+    Args:
+        csv_path: Path to the scraped_data.csv file
+    """
+    from src.pipelines.csv_storage import CSVStorageManager
+    
+    storage = CSVStorageManager(csv_path.parent, csv_path.name)
+    try:
+        await storage.compact()
+    except Exception as e:
+        logger.warning(f"Could not compact CSV journal for {csv_path}: {e}")
+    finally:
+        storage.close()
+
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -213,10 +303,13 @@ def parse_arguments():
 
 async def main():
     """Main entry point"""
+    _configure_logging()
     args = parse_arguments()
     
     logger.info("Starting Web Scraping Application")
-    logger.info(f"Configuration: {Config.to_dict()}")
+    # Only build the configuration dict when INFO is actually emitted
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Configuration: {Config.to_dict()}")
     
     if args.deep_search_only:
         logger.info("=" * 80)
@@ -225,6 +318,7 @@ async def main():
         
         # Read URLs from CSV that need deep search
         csv_path = Path(Config.OUTPUT_DIR) / "scraped_data.csv"
+        await _compact_csv_journal(csv_path)
         urls = get_missing_deep_search_urls(csv_path)
         
         if not urls:
@@ -245,6 +339,11 @@ async def main():
         logger.info(f"Automatically searching in {len(urls)} search URL(s)")
         logger.info("The system will automatically extract ALL listings from all pages")
     
+    # Heavy imports (Playwright, aiohttp, pipelines) are deferred until URLs are known,
+    # so --help and early exits don't pay for them
+    from src.core.proxy_manager import ProxyManager
+    from src.pipelines.data_pipeline import DataPipeline
+    
     # Initialize proxy manager if enabled
     proxy_manager = None
     if Config.PROXY_ENABLED:
@@ -265,9 +364,16 @@ async def main():
     else:
         logger.info("Running without proxies (direct connection)")
     
+    # Keep concurrency at or below the number of proxies to avoid per-IP rate limits
+    max_concurrent = Config.MAX_CONCURRENT
+    if proxy_manager and proxy_manager.proxies:
+        max_concurrent = min(max_concurrent, len(proxy_manager.proxies))
+    logger.info(f"Processing up to {max_concurrent} URL(s) concurrently")
+    
     # Create pipeline
     pipeline = DataPipeline(
         urls=urls,
+        max_concurrent=max_concurrent,
         proxy_manager=proxy_manager,
         deep_search_only=args.deep_search_only
     )
@@ -282,5 +388,11 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Optional: uvloop's event loop schedules the many concurrent CDP/HTTP sockets faster
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     asyncio.run(main())
 
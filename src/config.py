@@ -32,6 +32,8 @@ class Config:
     # Fingerprint Configuration
     FINGERPRINT_REGION: str = os.getenv("FINGERPRINT_REGION", "US")
     FINGERPRINT_ROTATION: bool = os.getenv("FINGERPRINT_ROTATION", "True").lower() == "true"
+    # Recreate the browser context with a new fingerprint after this many pages (0 disables)
+    CONTEXT_ROTATE_AFTER_PAGES: int = int(os.getenv("CONTEXT_ROTATE_AFTER_PAGES", "50"))
     
     # Human Behavior Configuration
     HUMAN_BEHAVIOR_ENABLED: bool = os.getenv("HUMAN_BEHAVIOR_ENABLED", "True").lower() == "true"
@@ -63,6 +65,7 @@ class Config:
     
     # Concurrency Configuration
     MAX_CONCURRENT: int = int(os.getenv("MAX_CONCURRENT", "3"))
+    HOST_REQUESTS_PER_SECOND: float = float(os.getenv("HOST_REQUESTS_PER_SECOND", "1.0"))  # Page requests per second per host (0 = unlimited)
     
     # Pagination Configuration
     MAX_PAGES: Optional[int] = int(os.getenv("MAX_PAGES")) if os.getenv("MAX_PAGES") else None
@@ -70,9 +73,12 @@ class Config:
     # Output Configuration
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "data")
     SAVE_IMAGES: bool = os.getenv("SAVE_IMAGES", "True").lower() == "true"
-    IMAGE_DOWNLOAD_DELAY: float = float(os.getenv("IMAGE_DOWNLOAD_DELAY", "0.2"))  # Delay between image downloads (seconds)
+    IMAGE_DOWNLOAD_RATE: float = float(os.getenv("IMAGE_DOWNLOAD_RATE", "10"))  # Max image requests per second across all listings (0 = unlimited)
+    IMAGE_DOWNLOAD_CONCURRENCY: int = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "4"))  # Images of a listing downloaded at once
     LISTINGS_CSV_FILENAME: str = os.getenv("LISTINGS_CSV_FILENAME", "scraped_data.csv")  # CSV file for initial listings
     DEEP_SEARCH_CSV_FILENAME: str = os.getenv("DEEP_SEARCH_CSV_FILENAME", "deep_search_data.csv")  # CSV file for deep search results
+    CSV_JOURNAL_MAX_BYTES: int = int(os.getenv("CSV_JOURNAL_MAX_BYTES", "1048576"))  # Journal size before compacting into the CSV (0 = every save)
+    CSV_GZIP_EXPORT: bool = os.getenv("CSV_GZIP_EXPORT", "False").lower() == "true"  # Also write a gzip-compressed copy of the CSV when a run finishes
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -188,7 +194,8 @@ class Config:
             },
             "fingerprint": {
                 "region": cls.FINGERPRINT_REGION,
-                "rotation": cls.FINGERPRINT_ROTATION
+                "rotation": cls.FINGERPRINT_ROTATION,
+                "context_rotate_after_pages": cls.CONTEXT_ROTATE_AFTER_PAGES
             },
             "human_behavior": {
                 "enabled": cls.HUMAN_BEHAVIOR_ENABLED,
@@ -217,14 +224,17 @@ class Config:
                 "max_page_delay": cls.MAX_PAGE_DELAY
             },
             "concurrency": {
-                "max_concurrent": cls.MAX_CONCURRENT
+                "max_concurrent": cls.MAX_CONCURRENT,
+                "host_requests_per_second": cls.HOST_REQUESTS_PER_SECOND
             },
             "pagination": {
                 "max_pages": cls.MAX_PAGES
             },
             "output": {
                 "output_dir": cls.OUTPUT_DIR,
-                "save_images": cls.SAVE_IMAGES
+                "save_images": cls.SAVE_IMAGES,
+                "csv_journal_max_bytes": cls.CSV_JOURNAL_MAX_BYTES,
+                "csv_gzip_export": cls.CSV_GZIP_EXPORT
             },
             "logging": {
                 "log_level": cls.LOG_LEVEL,
@@ -3,7 +3,9 @@ Browser Manager - Playwright Initialization and Shutdown Logic
 Manages browser configuration and anti-bot measures
 """
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import functools
 import logging
 import os
 import subprocess
@@ -15,11 +17,191 @@ from src.config import Config
 logger = logging.getLogger(__name__)
 
 
+# Chromium launch flags, built once per process
+# Chromium only honours the last --disable-features switch, so all features are listed in one
+_CHROMIUM_STEALTH_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-web-security",
+    "--disable-features=IsolateOrigins,site-per-process,TranslateUI",
+    "--disable-infobars",
+    "--disable-notifications",
+    "--disable-popup-blocking",
+    "--window-size=1920,1080",
+    "--start-maximized",
+    "--lang=pt-BR,pt",
+    # Additional stealth flags
+    "--disable-extensions-file-access-check",
+    "--disable-extensions-http-throttling",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-default-apps",
+    "--mute-audio",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-ipc-flooding-protection",
+)
+
+_CHROMIUM_HEADLESS_ARGS = (
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-extensions",
+)
+
+_CHROMIUM_DOCKER_HEADED_ARGS = (
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+)
+
+
+# Enhanced anti-bot script for Cloudflare evasion (static, independent of the fingerprint)
+_STATIC_STEALTH_JS = """
+    // Remove webdriver property completely
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Override plugins with realistic data
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => {
+            const plugins = [];
+            for (let i = 0; i < 5; i++) {
+                plugins.push({
+                    name: `Plugin ${i}`,
+                    description: `Plugin ${i} Description`,
+                    filename: `plugin${i}.dll`,
+                    length: Math.floor(Math.random() * 10) + 1
+                });
+            }
+            return plugins;
+        }
+    });
+    
+    // Override languages to match locale
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['pt-BR', 'pt', 'en-US', 'en']
+    });
+    
+    // Chrome runtime (important for Cloudflare detection)
+    window.chrome = {
+        runtime: {},
+        loadTimes: function() {},
+        csi: function() {},
+        app: {}
+    };
+    
+    // Override permissions API
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+    
+    // Override getBattery to return realistic values
+    if (navigator.getBattery) {
+        navigator.getBattery = () => Promise.resolve({
+            charging: true,
+            chargingTime: 0,
+            dischargingTime: Infinity,
+            level: 0.95
+        });
+    }
+    
+    // Override connection API
+    if (navigator.connection) {
+        Object.defineProperty(navigator, 'connection', {
+            get: () => ({
+                effectiveType: '4g',
+                rtt: 50,
+                downlink: 10,
+                saveData: false
+            })
+        });
+    }
+    
+    // Remove automation indicators
+    delete navigator.__proto__.webdriver;
+    
+    // Override toString methods to hide automation
+    const originalToString = Function.prototype.toString;
+    Function.prototype.toString = function() {
+        if (this === navigator.webdriver) {
+            return 'function webdriver() { [native code] }';
+        }
+        return originalToString.apply(this, arguments);
+    };
+"""
+
+
 def is_docker_environment() -> bool:
     """Check if running in Docker container"""
     return os.path.exists("/.dockerenv") or os.getenv("DOCKER_CONTAINER") == "true"
 
 
+@functools.lru_cache(maxsize=1)
+def _detect_runtime_headless() -> Optional[bool]:
+    """
+    Detect whether the runtime forces a headless mode (probed once, then cached)
+    
+    In Docker, Xvfb is used to run in non-headless mode (better for Cloudflare evasion).
+    Headless is only forced if no display is available.
+    
+    Returns:
+        Forced headless value when running in Docker, None otherwise
+    """
+    if not is_docker_environment():
+        return None
+    
+    # Check if DISPLAY is available (Xvfb should set this)
+    display = os.getenv("DISPLAY")
+    if not display:
+        # No display, must use headless
+        logger.warning("Docker environment detected but no DISPLAY available - forcing headless mode")
+        return True
+    
+    # Verify Xvfb is actually running by checking if we can connect to it
+    # This prevents trying to use non-headless mode when Xvfb isn't running
+    xvfb_running = False
+    try:
+        # Check if Xvfb process is running
+        result = subprocess.run(
+            ['pgrep', '-f', 'Xvfb'],
+            capture_output=True,
+            timeout=2
+        )
+        xvfb_running = result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+        # pgrep might not be available or Xvfb check failed
+        # Try alternative: check if we can actually use the display
+        try:
+            # Try to check if display is accessible
+            result = subprocess.run(
+                ['xdpyinfo', '-display', display],
+                capture_output=True,
+                timeout=2
+            )
+            xvfb_running = result.returncode == 0
+        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+            # xdpyinfo might not be available, assume Xvfb is not running
+            xvfb_running = False
+    
+    if xvfb_running:
+        # Xvfb is available and running, run in non-headless mode
+        logger.info(f"Docker environment detected with DISPLAY={display} and Xvfb running - using non-headless mode for better evasion")
+        return False
+    
+    # DISPLAY is set but Xvfb is not running, use headless mode
+    logger.warning(f"Docker environment detected with DISPLAY={display} but Xvfb is not running - forcing headless mode")
+    logger.warning("To use non-headless mode, ensure Xvfb is started before the application (e.g., 'Xvfb :99 -screen 0 1920x1080x24 &')")
+    return True
+
+
 class BrowserManager:
     """Manages Playwright browser initialization and shutdown with elite anti-detection"""
     
@@ -39,51 +221,10 @@ class BrowserManager:
             fingerprint_manager: FingerprintManager instance (creates new if None)
             fingerprint: Specific fingerprint to use (generates new if None)
         """
-        # In Docker, use Xvfb to run in non-headless mode (better for Cloudflare evasion)
-        # Only force headless if explicitly set or if no display available
-        if is_docker_environment():
-            # Check if DISPLAY is available (Xvfb should set this)
-            display = os.getenv("DISPLAY")
-            if display:
-                # Verify Xvfb is actually running by checking if we can connect to it
-                # This prevents trying to use non-headless mode when Xvfb isn't running
-                xvfb_running = False
-                try:
-                    # Check if Xvfb process is running
-                    result = subprocess.run(
-                        ['pgrep', '-f', 'Xvfb'],
-                        capture_output=True,
-                        timeout=2
-                    )
-                    xvfb_running = result.returncode == 0
-                except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-                    # pgrep might not be available or Xvfb check failed
-                    # Try alternative: check if we can actually use the display
-                    try:
-                        # Try to check if display is accessible
-                        result = subprocess.run(
-                            ['xdpyinfo', '-display', display],
-                            capture_output=True,
-                            timeout=2
-                        )
-                        xvfb_running = result.returncode == 0
-                    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-                        # xdpyinfo might not be available, assume Xvfb is not running
-                        xvfb_running = False
-                
-                if xvfb_running:
-                    # Xvfb is available and running, run in non-headless mode
-                    self.headless = False
-                    logger.info(f"Docker environment detected with DISPLAY={display} and Xvfb running - using non-headless mode for better evasion")
-                else:
-                    # DISPLAY is set but Xvfb is not running, use headless mode
-                    self.headless = True
-                    logger.warning(f"Docker environment detected with DISPLAY={display} but Xvfb is not running - forcing headless mode")
-                    logger.warning("To use non-headless mode, ensure Xvfb is started before the application (e.g., 'Xvfb :99 -screen 0 1920x1080x24 &')")
-            else:
-                # No display, must use headless
-                self.headless = True
-                logger.warning("Docker environment detected but no DISPLAY available - forcing headless mode")
+        # Docker display probing is done once per process and cached
+        runtime_headless = _detect_runtime_headless()
+        if runtime_headless is not None:
+            self.headless = runtime_headless
         else:
             self.headless = headless if headless is not None else Config.HEADLESS
         
@@ -96,6 +237,12 @@ class BrowserManager:
         self.fingerprint_manager = fingerprint_manager or FingerprintManager()
         self.current_fingerprint: Optional[BrowserFingerprint] = fingerprint
         self.current_proxy: Optional[Proxy] = None
+        # Set when the site blocked this browser: the replacement proxy and rotated
+        # fingerprint only take effect once the browser is relaunched
+        self.needs_relaunch = False
+        self._anti_bot_script_cache: Optional[Tuple[BrowserFingerprint, str]] = None
+        self._pages_served = 0
+        self._context_lock = asyncio.Lock()
     
     async def initialize(self, preferred_proxy_type: Optional[str] = None) -> BrowserContext:
         """
@@ -148,53 +295,15 @@ class BrowserManager:
         browser_args = []
         if Config.BROWSER_TYPE == "chromium":
             # Add stealth arguments to avoid bot detection (enhanced for Cloudflare evasion)
-            browser_args.extend([
-                "--disable-blink-features=AutomationControlled",
-                "--disable-dev-shm-usage",
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-web-security",
-                "--disable-features=IsolateOrigins,site-per-process",
-                "--disable-infobars",
-                "--disable-notifications",
-                "--disable-popup-blocking",
-                "--window-size=1920,1080",
-                "--start-maximized",
-                "--lang=pt-BR,pt",
-                "--accept-lang=pt-BR,pt;q=0.9",
-                # Additional stealth flags
-                "--disable-blink-features=AutomationControlled",
-                "--exclude-switches=enable-automation",
-                "--disable-extensions-file-access-check",
-                "--disable-extensions-http-throttling",
-                "--disable-component-extensions-with-background-pages",
-                "--disable-default-apps",
-                "--mute-audio",
-                "--no-first-run",
-                "--no-default-browser-check",
-                "--disable-background-timer-throttling",
-                "--disable-backgrounding-occluded-windows",
-                "--disable-renderer-backgrounding",
-                "--disable-features=TranslateUI",
-                "--disable-ipc-flooding-protection"
-            ])
+            browser_args.extend(_CHROMIUM_STEALTH_ARGS)
             
             # Only add headless arguments if actually running in headless mode
             # In Docker with Xvfb, we run in non-headless mode for better evasion
             if self.headless:
-                browser_args.extend([
-                    "--headless=new",
-                    "--disable-gpu",
-                    "--disable-software-rasterizer",
-                    "--disable-extensions"
-                ])
-            else:
-                # Non-headless mode - still disable GPU if in Docker
-                if is_docker_environment():
-                    browser_args.extend([
-                        "--disable-gpu",  # GPU not available in Docker/Xvfb
-                        "--disable-software-rasterizer"
-                    ])
+                browser_args.extend(_CHROMIUM_HEADLESS_ARGS)
+            elif is_docker_environment():
+                # Non-headless mode - still disable GPU (not available in Docker/Xvfb)
+                browser_args.extend(_CHROMIUM_DOCKER_HEADED_ARGS)
         
         logger.debug(f"Launching browser with headless={self.headless}, args={browser_args[:5]}...")
         
@@ -207,6 +316,19 @@ class BrowserManager:
             proxy=proxy_config
         )
         
+        self.context = await self._create_context()
+        
+        logger.info(f"Browser initialized with fingerprint: {self.current_fingerprint.user_agent[:50]}...")
+        
+        return self.context
+    
+    async def _create_context(self) -> BrowserContext:
+        """
+        Creates a browser context for the current fingerprint with anti-bot measures applied
+        
+        Returns:
+            BrowserContext: New browser context
+        """
         # Create context with fingerprint
         context_options = {
             "viewport": self.current_fingerprint.to_playwright_viewport(),
@@ -218,26 +340,52 @@ class BrowserManager:
             "java_script_enabled": True
         }
         
-        self.context = await self.browser.new_context(**context_options)
+        context = await self.browser.new_context(**context_options)
         
         # Configure anti-bot measures
-        await self.configure_anti_bot(self.context)
-        
-        logger.info(f"Browser initialized with fingerprint: {self.current_fingerprint.user_agent[:50]}...")
+        await self.configure_anti_bot(context)
         
-        return self.context
+        self._pages_served = 0
+        return context
     
     async def create_page(self) -> Page:
         """
         Creates a new page in the browser context
         
+        The context is kept alive between pages and only recreated (with a new
+        fingerprint) after Config.CONTEXT_ROTATE_AFTER_PAGES pages, once none of
+        its pages are still open.
+        
         Returns:
             Page: New browser page
         """
         if not self.context:
             await self.initialize()
         
-        return await self.context.new_page()
+        async with self._context_lock:
+            if self._should_rotate_context():
+                await self._rotate_context()
+            self._pages_served += 1
+            return await self.context.new_page()
+    
+    def _should_rotate_context(self) -> bool:
+        """Check if the context has served enough pages and is idle"""
+        rotate_after = Config.CONTEXT_ROTATE_AFTER_PAGES
+        if not Config.FINGERPRINT_ROTATION or rotate_after <= 0:
+            return False
+        # Never close a context while other tasks still have pages open in it
+        return self._pages_served >= rotate_after and not self.context.pages
+    
+    async def _rotate_context(self) -> None:
+        """Replaces the context with a fresh one using a new fingerprint, keeping the browser"""
+        try:
+            await self.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing context during rotation: {e}")
+        self.context = None
+        self.rotate_fingerprint()
+        self.context = await self._create_context()
+        logger.info(f"Browser context recycled after {Config.CONTEXT_ROTATE_AFTER_PAGES} pages")
     
     async def configure_anti_bot(self, context: BrowserContext) -> None:
         """
@@ -249,90 +397,32 @@ class BrowserManager:
         if not self.current_fingerprint:
             return
         
-        # Inject anti-detect script
-        anti_detect_script = self.fingerprint_manager.get_anti_detect_script(self.current_fingerprint)
-        await context.add_init_script(anti_detect_script)
+        # Both scripts are sent in a single init-script call (one CDP round-trip)
+        await context.add_init_script(self._get_anti_bot_script(self.current_fingerprint))
         
-        # Enhanced anti-bot script for Cloudflare evasion
-        await context.add_init_script("""
-            // Remove webdriver property completely
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Override plugins with realistic data
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => {
-                    const plugins = [];
-                    for (let i = 0; i < 5; i++) {
-                        plugins.push({
-                            name: `Plugin ${i}`,
-                            description: `Plugin ${i} Description`,
-                            filename: `plugin${i}.dll`,
-                            length: Math.floor(Math.random() * 10) + 1
-                        });
-                    }
-                    return plugins;
-                }
-            });
-            
-            // Override languages to match locale
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['pt-BR', 'pt', 'en-US', 'en']
-            });
-            
-            // Chrome runtime (important for Cloudflare detection)
-            window.chrome = {
-                runtime: {},
-                loadTimes: function() {},
-                csi: function() {},
-                app: {}
-            };
-            
-            // Override permissions API
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-            );
-            
-            // Override getBattery to return realistic values
-            if (navigator.getBattery) {
-                navigator.getBattery = () => Promise.resolve({
-                    charging: true,
-                    chargingTime: 0,
-                    dischargingTime: Infinity,
-                    level: 0.95
-                });
-            }
-            
-            // Override connection API
-            if (navigator.connection) {
-                Object.defineProperty(navigator, 'connection', {
-                    get: () => ({
-                        effectiveType: '4g',
-                        rtt: 50,
-                        downlink: 10,
-                        saveData: false
-                    })
-                });
-            }
-            
-            // Remove automation indicators
-            delete navigator.__proto__.webdriver;
+        logger.debug("Anti-bot measures configured")
+    
+    def _get_anti_bot_script(self, fingerprint: BrowserFingerprint) -> str:
+        """
+        Builds the combined anti-detection init script, cached per fingerprint
+        
+        Args:
+            fingerprint: Fingerprint whose values are substituted in the script
             
-            // Override toString methods to hide automation
-            const originalToString = Function.prototype.toString;
-            Function.prototype.toString = function() {
-                if (this === navigator.webdriver) {
-                    return 'function webdriver() { [native code] }';
-                }
-                return originalToString.apply(this, arguments);
-            };
-        """)
+        Returns:
+            JavaScript code as string
+        """
+        if self._anti_bot_script_cache and self._anti_bot_script_cache[0] is fingerprint:
+            return self._anti_bot_script_cache[1]
         
-        logger.debug("Anti-bot measures configured")
+        anti_detect_script = self.fingerprint_manager.get_anti_detect_script(fingerprint)
+        # Each part is isolated so an error in one does not prevent the other from running
+        combined = (
+            f"try {{\n{anti_detect_script}\n}} catch (e) {{}}\n"
+            f"try {{\n{_STATIC_STEALTH_JS}\n}} catch (e) {{}}\n"
+        )
+        self._anti_bot_script_cache = (fingerprint, combined)
+        return combined
     
     def rotate_fingerprint(self) -> BrowserFingerprint:
         """
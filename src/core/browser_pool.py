@@ -0,0 +1,105 @@
+"""
+Browser Pool - Reuse of warm BrowserManager instances
+Amortizes the browser cold start across many URLs
+"""
+import asyncio
+from typing import List, Optional
+import logging
+
+from src.core.browser_manager import BrowserManager
+from src.core.proxy_manager import ProxyManager
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """Pool of up to pool_size BrowserManager instances shared between tasks"""
+
+    def __init__(
+        self,
+        pool_size: int,
+        proxy_manager: Optional[ProxyManager] = None,
+        headless: Optional[bool] = None
+    ):
+        """
+        Initializes the BrowserPool
+
+        Browsers are created lazily on first acquire and kept warm afterwards,
+        so at most pool_size browsers are ever running at the same time.
+
+        Args:
+            pool_size: Maximum number of browsers in the pool
+            proxy_manager: ProxyManager passed to each BrowserManager
+            headless: Headless mode for each browser (uses Config if None)
+        """
+        self.pool_size = max(1, pool_size)
+        self.proxy_manager = proxy_manager
+        self.headless = headless if headless is not None else Config.HEADLESS
+
+        self._available: asyncio.Queue = asyncio.Queue()
+        self._managers: List[BrowserManager] = []
+        self._create_lock = asyncio.Lock()
+
+    async def acquire(self) -> BrowserManager:
+        """
+        Check out a browser from the pool, creating one if the pool is not full
+
+        Returns:
+            BrowserManager: Browser reserved for the caller until release
+        """
+        if self._available.empty():
+            async with self._create_lock:
+                if len(self._managers) < self.pool_size:
+                    browser_manager = BrowserManager(
+                        headless=self.headless,
+                        proxy_manager=self.proxy_manager
+                    )
+                    self._managers.append(browser_manager)
+                    logger.debug(f"Browser pool grew to {len(self._managers)}/{self.pool_size}")
+                    return browser_manager
+
+        return await self._available.get()
+
+    async def release(self, browser_manager: BrowserManager, discard: bool = False) -> None:
+        """
+        Return a browser to the pool
+
+        Browsers that were blocked are discarded as well, so the next URL gets a
+        freshly launched browser with a new proxy and fingerprint instead of the
+        one the site just blocked.
+
+        Args:
+            browser_manager: Browser previously obtained from acquire
+            discard: If True, close the browser and free its slot (e.g. after a crash)
+        """
+        if discard or browser_manager.needs_relaunch:
+            if browser_manager in self._managers:
+                self._managers.remove(browser_manager)
+            try:
+                await browser_manager.close()
+            except Exception as e:
+                logger.debug(f"Error closing discarded browser: {e}")
+            return
+
+        await self._available.put(browser_manager)
+
+    async def close(self) -> None:
+        """Closes every browser created by the pool"""
+        for browser_manager in self._managers:
+            try:
+                await browser_manager.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled browser: {e}")
+
+        self._managers.clear()
+        self._available = asyncio.Queue()
+        logger.debug("Browser pool closed")
+
+    async def __aenter__(self):
+        """Context manager entry"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        await self.close()
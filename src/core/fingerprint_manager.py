@@ -4,8 +4,8 @@ Generates unique, consistent browser fingerprints to avoid detection
 """
 import random
 import json
-from typing import Dict, Optional, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Optional, List, Tuple
+from dataclasses import dataclass, asdict, astuple
 from fake_useragent import UserAgent
 import logging
 
@@ -97,6 +97,9 @@ class FingerprintManager:
         "Apple GPU"
     ]
     
+    # Maximum number of anti-detect scripts kept in the per-manager cache
+    MAX_CACHED_SCRIPTS = 128
+    
     def __init__(self, ua: Optional[UserAgent] = None):
         """
         Initialize FingerprintManager
@@ -106,6 +109,8 @@ class FingerprintManager:
         """
         self.ua = ua or UserAgent()
         self.generated_fingerprints: List[BrowserFingerprint] = []
+        # Anti-detect scripts keyed by fingerprint values (fingerprints are reused across contexts)
+        self._anti_detect_scripts: Dict[Tuple, str] = {}
     
     def generate_fingerprint(self, region: str = "US") -> BrowserFingerprint:
         """
@@ -216,7 +221,27 @@ class FingerprintManager:
     
     def get_anti_detect_script(self, fingerprint: BrowserFingerprint) -> str:
         """
-        Generate JavaScript to inject for anti-detection
+        Generate JavaScript to inject for anti-detection (cached per fingerprint values)
+        
+        Args:
+            fingerprint: BrowserFingerprint to use
+            
+        Returns:
+            JavaScript code as string
+        """
+        key = astuple(fingerprint)
+        script = self._anti_detect_scripts.get(key)
+        if script is None:
+            if len(self._anti_detect_scripts) >= self.MAX_CACHED_SCRIPTS:
+                # Drop the oldest entry (dicts keep insertion order)
+                del self._anti_detect_scripts[next(iter(self._anti_detect_scripts))]
+            script = self._build_anti_detect_script(fingerprint)
+            self._anti_detect_scripts[key] = script
+        return script
+    
+    def _build_anti_detect_script(self, fingerprint: BrowserFingerprint) -> str:
+        """
+        Build the anti-detection JavaScript for a fingerprint
         
         Args:
             fingerprint: BrowserFingerprint to use
@@ -9,6 +9,8 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+import aiohttp
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,6 +87,8 @@ class ProxyManager:
         self.cooldown_seconds = cooldown_seconds
         self.current_index = 0
         self._lock = asyncio.Lock()
+        # Long-lived HTTP sessions, one per proxy (keeps connections to the proxy alive)
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
         
     def add_proxy(
         self,
@@ -231,4 +235,43 @@ class ProxyManager:
             }
         
         return stats
-
+    
+    def get_session(self, proxy: Proxy) -> Optional[aiohttp.ClientSession]:
+        """
+        Get the shared aiohttp session that routes requests through a proxy
+        
+        Sessions are created on first use and reused afterwards, so TCP/TLS
+        connections to the proxy are kept alive between requests.
+        
+        Args:
+            proxy: Proxy to route requests through
+            
+        Returns:
+            aiohttp.ClientSession, or None if the proxy protocol is not supported by aiohttp (socks5)
+        """
+        if proxy.protocol not in ("http", "https"):
+            return None
+        
+        key = f"{proxy.host}:{proxy.port}"
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            proxy_auth = None
+            if proxy.username and proxy.password:
+                proxy_auth = aiohttp.BasicAuth(proxy.username, proxy.password)
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=10, ttl_dns_cache=300),
+                proxy=proxy.server,
+                proxy_auth=proxy_auth
+            )
+            self._sessions[key] = session
+        return session
+    
+    async def close(self) -> None:
+        """Close all proxy HTTP sessions"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.debug(f"Error closing proxy session: {e}")
@@ -0,0 +1,36 @@
+"""
+Rate Limiter - Token bucket for pacing outgoing requests
+Shared by concurrent tasks, so the combined request rate stays bounded
+"""
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket allowing bursts of up to `rate` requests, refilled at `rate` per second"""
+    
+    def __init__(self, rate: float):
+        """
+        Initialize Rate Limiter
+        
+        Args:
+            rate: Requests per second (must be positive)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
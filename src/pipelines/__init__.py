@@ -1,10 +1,16 @@
 # Pipelines Module - Data Flow Orchestration
+# Classes are imported lazily on first access (PEP 562), so importing one
+# pipeline module doesn't pull in all the others and their dependencies
 
-from src.pipelines.data_pipeline import DataPipeline
-from src.pipelines.csv_storage import CSVStorageManager
-from src.pipelines.image_downloader import ImageDownloader
-from src.pipelines.url_processor import URLProcessor
-from src.pipelines.pipeline_orchestrator import PipelineOrchestrator
+import importlib
+
+_LAZY_EXPORTS = {
+    'DataPipeline': 'src.pipelines.data_pipeline',
+    'CSVStorageManager': 'src.pipelines.csv_storage',
+    'ImageDownloader': 'src.pipelines.image_downloader',
+    'URLProcessor': 'src.pipelines.url_processor',
+    'PipelineOrchestrator': 'src.pipelines.pipeline_orchestrator',
+}
 
 __all__ = [
     'DataPipeline',
@@ -13,3 +19,16 @@ __all__ = [
     'URLProcessor',
     'PipelineOrchestrator',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
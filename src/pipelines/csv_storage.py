@@ -3,39 +3,112 @@ CSV Storage Manager - Handles all CSV operations
 Manages reading, writing, merging, and validation of CSV data
 """
 import asyncio
+import contextlib
 import csv
+import functools
+import gzip
+import io
 import json
 import logging
+import mmap
+import os
+import shutil
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only coroutines of the same process are serialized
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+# Substring identifying listing URLs in header-less CSVs
+_LISTING_URL_MARKER = 'zapimoveis.com.br/imovel'
+_LISTING_URL_MARKER_BYTES = _LISTING_URL_MARKER.encode('utf-8')
+
+# Reused encoders: json.dumps with non-default options builds a new JSONEncoder per call
+_CELL_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_JOURNAL_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str, separators=(',', ':'))
+
+# String values treated as empty when merging (compared stripped and lower-cased)
+_EMPTY_STRINGS = frozenset(('', 'none', 'null', 'false'))
+
+# Buffer for bulk CSV writes: one write(2) per MiB instead of per 8 KiB
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Columns with few distinct values; their cells are interned when the CSV is read so
+# repeated values share one string object instead of one copy per row
+_INTERNED_COLUMNS = frozenset(('location', 'property_type', 'bedrooms', 'bathrooms', 'parking_spaces'))
+
+# Fast gzip level for the .csv.gz export: most of the size reduction for little CPU
+_GZIP_COMPRESSLEVEL = 3
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_fieldname(fieldname: str) -> bool:
+    """Check if a fieldname is valid (not a generic column_* name)"""
+    if not fieldname or not isinstance(fieldname, str):
+        return False
+    # Filter out generic column names like "column_42", "column_43", etc.
+    if fieldname.startswith('column_') and fieldname[7:].isdigit():
+        return False
+    return True
+
 
 class CSVStorageManager:
     """Manages CSV file operations with file locking and data merging"""
     
-    def __init__(self, output_dir: Path, filename: str = "scraped_data.csv"):
+    def __init__(
+        self,
+        output_dir: Path,
+        filename: str = "scraped_data.csv",
+        journal_max_bytes: int = 0
+    ):
         """
         Initialize CSV Storage Manager
         
         Args:
             output_dir: Directory where CSV file will be stored
             filename: Name of the CSV file
+            journal_max_bytes: Size the single-listing journal may reach before it is
+                compacted into the CSV (0 compacts on every save)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.filename = filename
         self.filepath = self.output_dir / filename
+        self.journal_max_bytes = journal_max_bytes
+        
+        # Parsed CSV contents as (stat key, data, fieldnames), where the stat key is the
+        # (filepath, mtime_ns, size) of the file they came from. Replaced as one tuple
+        # because compaction updates it from a worker thread.
+        self._cache: Optional[Tuple[Tuple[str, int, int], Dict[str, Dict], List[str]]] = None
+        
+        # Serializes this manager's coroutines; flock excludes other processes
+        # (it is per open file, so it cannot exclude coroutines sharing the fd)
+        self._write_lock = asyncio.Lock()
+        self._lock_fds: Dict[Path, int] = {}
     
-    def is_valid_fieldname(self, fieldname: str) -> bool:
-        """Check if a fieldname is valid (not a generic column_* name)"""
-        if not fieldname or not isinstance(fieldname, str):
-            return False
-        # Filter out generic column names like "column_42", "column_43", etc.
-        if fieldname.startswith('column_') and fieldname[7:].isdigit():
-            return False
-        return True
+    @property
+    def tmp_path(self) -> Path:
+        """Scratch file for full rewrites, swapped in with os.replace so readers never see a partial CSV"""
+        return self.filepath.with_name(self.filepath.name + '.tmp')
+    
+    @property
+    def gzip_export_path(self) -> Path:
+        """Gzip-compressed copy of the CSV written by export_gzip (the CSV itself stays plain text)"""
+        return self.filepath.with_name(self.filepath.name + '.gz')
+    
+    @property
+    def journal_path(self) -> Path:
+        """Append-only journal (JSON lines) of single-listing saves not yet folded into the CSV"""
+        return self.filepath.with_suffix('.jsonl')
+    
+    # The same few dozen keys are checked for every listing and header, so the
+    # result is memoized per fieldname (looked up as a plain function, no method call)
+    is_valid_fieldname = staticmethod(_is_valid_fieldname)
     
     def filter_valid_fieldnames(self, fieldnames: List[str]) -> List[str]:
         """Filter out invalid fieldnames"""
@@ -45,41 +118,44 @@ class CSVStorageManager:
         """
         Convert a result dictionary to a CSV-compatible row.
         Preserves all data types and handles None/empty values correctly.
+        
+        Args:
+            result: Result dictionary to convert
         """
         row = {}
         for key, value in result.items():
             # Skip invalid fieldnames
             if not self.is_valid_fieldname(key):
                 continue
-            
-            # Handle None values
-            if value is None:
-                row[key] = None
-            # Handle nested dictionaries by converting to string
-            elif isinstance(value, dict):
-                try:
-                    row[key] = json.dumps(value, ensure_ascii=False)
-                except (TypeError, ValueError):
-                    row[key] = str(value)
-            # Handle lists - preserve as comma-separated string
-            elif isinstance(value, list):
-                if len(value) == 0:
-                    row[key] = None  # Empty list becomes None
-                else:
-                    row[key] = ', '.join(str(v) for v in value)
-            # Handle all other types (str, int, float, bool, etc.)
-            else:
-                row[key] = value
+            row[key] = self._convert_value(value)
         
         return row
     
-    def get_all_fieldnames(self, listings: List[Dict]) -> List[str]:
+    def _convert_value(self, value):
+        """Convert a single listing value to its CSV cell value"""
+        # Handle None values
+        if value is None:
+            return None
+        # Handle nested dictionaries by converting to string
+        if isinstance(value, dict):
+            try:
+                return _CELL_JSON_ENCODER.encode(value)
+            except (TypeError, ValueError):
+                return str(value)
+        # Handle lists - preserve as comma-separated string
+        if isinstance(value, list):
+            if len(value) == 0:
+                return None  # Empty list becomes None
+            return ', '.join(str(v) for v in value)
+        # Handle all other types (str, int, float, bool, etc.)
+        return value
+    
+    def get_all_fieldnames(self, listings: Iterable[Dict]) -> List[str]:
         """Extract all unique field names from listings, filtering invalid ones"""
-        fieldnames: Set[str] = set()
-        for listing in listings:
-            valid_keys = [k for k in listing.keys() if self.is_valid_fieldname(k)]
-            fieldnames.update(valid_keys)
-        return sorted(fieldnames)
+        # Union the key sets first so each distinct key is validated once,
+        # not once per listing
+        all_keys: Set[str] = set().union(*(listing.keys() for listing in listings))
+        return sorted(key for key in all_keys if self.is_valid_fieldname(key))
     
     def ensure_csv_headers(self, fieldnames: List[str]) -> None:
         """Ensure CSV file exists with headers if it doesn't exist"""
@@ -96,7 +172,109 @@ class CSVStorageManager:
         first_line_lower = first_line.lower()
         return any(indicator in first_line_lower for indicator in header_indicators)
     
+    def _find_url_column(self, mm: mmap.mmap) -> Optional[int]:
+        """
+        Find the index of the column holding listing URLs in a header-less CSV
+        
+        Locates the first listing URL with a single search over the mapped file
+        and only parses the line it appears on.
+        
+        Args:
+            mm: Read-only memory map of the CSV file
+            
+        Returns:
+            Column index, or None if the file has no listing URL
+        """
+        idx = mm.find(_LISTING_URL_MARKER_BYTES)
+        if idx == -1:
+            return None
+        
+        line_start = mm.rfind(b'\n', 0, idx) + 1
+        line_end = mm.find(b'\n', idx)
+        if line_end == -1:
+            line_end = len(mm)
+        
+        line = mm[line_start:line_end].decode('utf-8', errors='replace')
+        for row in csv.reader([line]):
+            for i, value in enumerate(row):
+                if _LISTING_URL_MARKER in value:
+                    return i
+        return None
+    
     def _read_existing_data(self) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Read existing data: the CSV plus any journaled saves not yet compacted into it.
+        
+        Returns:
+            Tuple of (existing_data dict keyed by URL, existing_fieldnames list)
+        """
+        existing_data, existing_fieldnames = self._read_csv_data()
+        applied = self._apply_journal(existing_data)
+        if applied:
+            logger.debug(f"Applied {applied} journaled listings on top of CSV data")
+        return existing_data, existing_fieldnames
+    
+    def _csv_stat_key(self) -> Optional[Tuple[str, int, int]]:
+        """Identity of the CSV file on disk (path, mtime_ns, size), None if it does not exist"""
+        try:
+            st = self.filepath.stat()
+        except OSError:
+            return None
+        return (str(self.filepath), st.st_mtime_ns, st.st_size)
+    
+    def _read_csv_data(self) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Read existing CSV data, reusing the last parse while the file is unchanged on disk
+        
+        Returns:
+            Tuple of (existing_data dict keyed by URL, existing_fieldnames list)
+        """
+        key = self._csv_stat_key()
+        cache = self._cache
+        if key is not None and cache is not None and cache[0] == key:
+            logger.debug(f"Using cached CSV data for {self.filepath}")
+            _, existing_data, existing_fieldnames = cache
+        else:
+            existing_data, existing_fieldnames = self._parse_csv_file()
+            self._cache = (key, existing_data, existing_fieldnames) if key is not None else None
+        
+        # Rows are flat dicts of strings/None, a per-row copy keeps the cache untouched by callers
+        return {url: dict(row) for url, row in existing_data.items()}, list(existing_fieldnames)
+    
+    def _row_as_read(self, row: Tuple, fieldnames: List[str]) -> Dict:
+        """Row as _parse_csv_file would read it back after csv.writer wrote it"""
+        read_row = {}
+        for fieldname, value in zip(fieldnames, row):
+            text = '' if value is None else str(value)
+            read_row[fieldname] = text.strip() or None
+        return read_row
+    
+    def _remember_written(self, rows: List[Tuple], fieldnames: List[str]) -> None:
+        """
+        Seed the read cache with rows just written to the CSV, so the next read skips parsing
+        
+        Args:
+            rows: Rows exactly as written by _write_listings
+            fieldnames: Header written to the file
+        """
+        self._cache = None
+        if 'url' not in fieldnames:
+            return
+        
+        cached: Dict[str, Dict] = {}
+        for row in rows:
+            read_row = self._row_as_read(row, fieldnames)
+            url = read_row.get('url')
+            if not url:
+                # Rows without URL get positional keys on read; let the next read parse the file
+                return
+            cached[url] = read_row
+        
+        key = self._csv_stat_key()
+        if key is not None:
+            self._cache = (key, cached, list(fieldnames))
+    
+    def _parse_csv_file(self) -> Tuple[Dict[str, Dict], List[str]]:
         """
         Read existing CSV data, preserving ALL data including empty fields.
         This is critical for deep search to not lose any existing data.
@@ -112,18 +290,32 @@ class CSVStorageManager:
             return existing_data, existing_fieldnames
         
         try:
-            with open(self.filepath, 'r', newline='', encoding='utf-8') as f:
-                # Read first line to check if it's a header or data
-                first_line = f.readline().strip()
-                f.seek(0)  # Reset to beginning
-                
-                has_headers = self._detect_has_headers(first_line)
+            # One open for everything: the mmap is used for the byte searches and,
+            # since mapping does not move the file position, the same handle is then
+            # decoded from offset 0 for csv parsing (no reopen, no seek)
+            with open(self.filepath, 'rb') as raw, io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+                # Check the first line and locate the URL column with byte searches
+                # instead of reading and scanning rows in Python
+                with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    line_end = mm.find(b'\n')
+                    first_line = mm[:line_end if line_end != -1 else len(mm)].decode('utf-8', errors='replace').strip()
+                    has_headers = self._detect_has_headers(first_line)
+                    url_column_index = None if has_headers else self._find_url_column(mm)
+                    # Without a single listing URL in the file no row needs a per-column URL search
+                    has_listing_urls = url_column_index is not None or mm.find(_LISTING_URL_MARKER_BYTES) != -1
                 
                 if has_headers:
-                    # CSV has headers - use DictReader normally
-                    reader = csv.DictReader(f)
-                    existing_fieldnames = reader.fieldnames or []
-                    existing_fieldnames = self.filter_valid_fieldnames(existing_fieldnames)
+                    # CSV has headers - plain csv.reader, rows are mapped to the header
+                    # by column index instead of building a DictReader dict per row
+                    reader = csv.reader(f)
+                    header = next(reader, [])
+                    existing_fieldnames = self.filter_valid_fieldnames(header)
+                    # Last occurrence of a duplicated header wins, as with DictReader
+                    header_index = {name: i for i, name in enumerate(header)}
+                    columns = [(name, header_index[name]) for name in existing_fieldnames]
+                    # Rows at least this long can be indexed without bounds checks
+                    full_row_len = max((index for _, index in columns), default=-1) + 1
+                    interned_columns = [name for name in existing_fieldnames if name in _INTERNED_COLUMNS]
                     
                     # CRITICAL: Preserve fieldnames even if rows are empty
                     # This ensures we don't lose column structure
@@ -131,56 +323,34 @@ class CSVStorageManager:
                 else:
                     # CSV has no headers - read as list and try to infer structure
                     logger.warning(f"CSV file has no headers, reading as data and will add headers when saving")
-                    f.seek(0)  # Reset to beginning
-                    list_reader = csv.reader(f)
-                    rows = list(list_reader)
-                    
-                    if not rows:
-                        return existing_data, existing_fieldnames
-                    
-                    # Find the column that contains URLs to identify the 'url' column
-                    url_column_index = None
-                    for row in rows[:10]:  # Check first 10 rows
-                        for i, value in enumerate(row):
-                            if isinstance(value, str) and 'zapimoveis.com.br/imovel' in value:
-                                url_column_index = i
-                                break
-                        if url_column_index is not None:
-                            break
                     
                     # Try to infer fieldnames from known structure
                     # We know common field positions from typical CSV structure
                     # But since we can't reliably infer, we'll use the data itself
                     # and let the save process create proper headers
                     
-                    # For now, read all rows as data (not as dicts)
-                    # We'll extract fieldnames from the data when we have listings
-                    for row in rows:
-                        # Check if row is completely empty
-                        is_empty_row = True
-                        for value in row:
-                            if value and str(value).strip():
-                                is_empty_row = False
-                                break
-                        
+                    # Read all rows as data (not as dicts), streaming instead of materializing
+                    # the whole file; column_N keys are built once and reused for every row
+                    column_keys: List[str] = []
+                    for row in csv.reader(f):
                         # Skip completely empty rows
-                        if is_empty_row:
+                        if not any(value.strip() for value in row):
                             continue
                         
+                        if len(row) > len(column_keys):
+                            column_keys.extend(f'column_{i}' for i in range(len(column_keys), len(row)))
+                        
                         # Create a temporary dict with column indices as keys
-                        row_dict = {f'column_{i}': value if value else None for i, value in enumerate(row)}
+                        row_dict = {key: value or None for key, value in zip(column_keys, row)}
                         
-                        # Try to find URL
+                        # Try to find URL in the known URL column
                         url = None
                         if url_column_index is not None and url_column_index < len(row):
-                            url = row[url_column_index].strip() if row[url_column_index] else None
+                            url = row[url_column_index].strip() or None
                         
-                        if not url:
-                            # Search for URL in any column
-                            for value in row:
-                                if isinstance(value, str) and 'zapimoveis.com.br/imovel' in value:
-                                    url = value.strip()
-                                    break
+                        if not url and has_listing_urls:
+                            # Search for URL in any column (only rows whose URL column is empty)
+                            url = next((value.strip() for value in row if _LISTING_URL_MARKER in value), None)
                         
                         if url:
                             existing_data[url] = row_dict
@@ -193,46 +363,44 @@ class CSVStorageManager:
                     existing_fieldnames = []
                     # Don't use DictReader here since we already read the data
                     reader = iter([])  # Empty iterator since we already processed rows
+                    columns = []
+                    full_row_len = 0
+                    interned_columns = []
                 
                 # Read ALL existing rows - preserve EVERYTHING including empty values
                 row_count = 0
                 for row in reader:
+                    # Blank lines are not rows (DictReader semantics)
+                    if not row:
+                        continue
                     row_count += 1
                     
-                    # Create a copy of the row to preserve all data
-                    row_copy = {}
-                    
                     # CRITICAL: Preserve ALL fieldnames from header, even if row values are empty
                     # This ensures we maintain the column structure
-                    if has_headers and existing_fieldnames:
-                        # For rows with headers, ensure ALL header fields are in row_copy
-                        # This is critical - even if row is empty, we preserve the structure
-                        for fieldname in existing_fieldnames:
-                            if self.is_valid_fieldname(fieldname):
-                                # Get value from row, default to empty string if not present
-                                value = row.get(fieldname, '')
-                                # Preserve the value as-is (empty strings become None for consistency)
-                                row_copy[fieldname] = value.strip() if value and value.strip() else None
+                    # (existing_fieldnames are already validated, short rows yield None)
+                    # Values are stripped, empty strings become None for consistency
+                    if len(row) >= full_row_len:
+                        row_copy = {fieldname: row[index].strip() or None for fieldname, index in columns}
                     else:
-                        # For rows without headers, process normally
-                        for key, value in row.items():
-                            if self.is_valid_fieldname(key):
-                                row_copy[key] = value if value != '' else None
-                    
-                    # Check if row is completely empty (all values are None or empty)
-                    is_empty_row = True
-                    for value in row_copy.values():
-                        if value is not None and str(value).strip():
-                            is_empty_row = False
-                            break
+                        row_len = len(row)
+                        row_copy = {
+                            fieldname: (row[index].strip() or None) if index < row_len else None
+                            for fieldname, index in columns
+                        }
                     
                     # Skip completely empty rows - they don't contain any data
-                    if is_empty_row:
+                    # (every value is already stripped or None)
+                    if all(value is None for value in row_copy.values()):
                         logger.debug(f"Row {row_count} is completely empty, skipping")
                         continue
                     
+                    for fieldname in interned_columns:
+                        value = row_copy[fieldname]
+                        if value is not None:
+                            row_copy[fieldname] = sys.intern(value)
+                    
                     # Find URL in the row
-                    url = row_copy.get('url', '').strip() if row_copy.get('url') else ''
+                    url = row_copy.get('url') or ''
                     
                     if url:
                         # Use URL as key and store all row data
@@ -241,7 +409,7 @@ class CSVStorageManager:
                         # Handle rows without URL - check if row has any URL-like values
                         url_found = False
                         for key, value in row_copy.items():
-                            if isinstance(value, str) and 'zapimoveis.com.br/imovel' in value:
+                            if isinstance(value, str) and _LISTING_URL_MARKER in value:
                                 existing_data[value] = row_copy
                                 url_found = True
                                 break
@@ -256,13 +424,9 @@ class CSVStorageManager:
             # If we had to infer fieldnames, try to extract real fieldnames from data
             if not has_headers and existing_data:
                 # Extract fieldnames from all existing data
-                all_keys = set()
-                for listing_data in existing_data.values():
-                    for key in listing_data.keys():
-                        if self.is_valid_fieldname(key):
-                            all_keys.add(key)
+                all_keys = self.get_all_fieldnames(existing_data.values())
                 if all_keys:
-                    existing_fieldnames = sorted(all_keys)
+                    existing_fieldnames = all_keys
                     logger.info(f"Inferred {len(existing_fieldnames)} fieldnames from existing data")
             
             # CRITICAL: Ensure we preserve fieldnames even if no data rows exist
@@ -283,19 +447,13 @@ class CSVStorageManager:
         if val is None:
             return True
         if isinstance(val, str):
-            return val.strip() == '' or val.strip().lower() in ['none', 'null', 'false']
+            stripped = val.strip()
+            # Only short strings can be one of the sentinels, skip lower() for the rest
+            return not stripped or (len(stripped) <= 5 and stripped.lower() in _EMPTY_STRINGS)
         if isinstance(val, list):
-            return len(val) == 0
+            return not val
         return False
     
-    def _normalize_value_for_comparison(self, val) -> str:
-        """Normalize value for comparison (convert to string representation)"""
-        if val is None:
-            return ''
-        if isinstance(val, list):
-            return ', '.join(str(v) for v in val)
-        return str(val)
-    
     def _merge_listing_data(self, existing_row: Dict, new_listing: Dict) -> Dict:
         """
         Merge new listing data with existing row, preserving ALL existing data.
@@ -320,10 +478,6 @@ class CSVStorageManager:
             
             existing_value = merged.get(key)
             
-            # Convert values for comparison
-            new_value_normalized = self._normalize_value_for_comparison(new_value)
-            existing_value_normalized = self._normalize_value_for_comparison(existing_value) if existing_value is not None else ''
-            
             # Strategy: Deep search data takes priority, but only if it's not empty
             if not self._is_empty_value(new_value):
                 # New value is not empty - update (deep search data takes priority)
@@ -341,9 +495,9 @@ class CSVStorageManager:
                 merged[key] = None
         
         if updated_fields:
-            logger.info(f"Updated {len(updated_fields)} existing fields: {', '.join(updated_fields[:10])}{'...' if len(updated_fields) > 10 else ''}")
+            logger.debug(f"Updated {len(updated_fields)} existing fields: {', '.join(updated_fields[:10])}{'...' if len(updated_fields) > 10 else ''}")
         if new_fields:
-            logger.info(f"Added {len(new_fields)} new fields: {', '.join(new_fields[:10])}{'...' if len(new_fields) > 10 else ''}")
+            logger.debug(f"Added {len(new_fields)} new fields: {', '.join(new_fields[:10])}{'...' if len(new_fields) > 10 else ''}")
         
         return merged
     
@@ -365,12 +519,124 @@ class CSVStorageManager:
         
         return False
     
-    async def _acquire_lock(self, lock_file: Path, max_wait: float = 10.0) -> None:
-        """Acquire file lock, waiting if necessary"""
-        wait_time = 0.0
-        while lock_file.exists() and wait_time < max_wait:
-            await asyncio.sleep(0.1)
-            wait_time += 0.1
+    def _append_journal(self, listing: Dict) -> int:
+        """
+        Append a listing to the journal as one JSON line
+        
+        The line is written with a single unbuffered O_APPEND write, so concurrent
+        appends never interleave.
+        
+        Args:
+            listing: Listing dictionary to journal
+            
+        Returns:
+            Journal size in bytes after the append
+        """
+        line = _JOURNAL_JSON_ENCODER.encode(listing) + '\n'
+        with open(self.journal_path, 'ab', buffering=0) as f:
+            f.write(line.encode('utf-8'))
+            return f.tell()
+    
+    def _load_journal(self) -> List[Dict]:
+        """
+        Read the journaled listings, in the order they were saved
+        
+        Returns:
+            Listings with a URL (corrupt lines are skipped)
+        """
+        if not self.journal_path.exists():
+            return []
+        
+        listings = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    listing = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping corrupt entry in journal {self.journal_path}")
+                    continue
+                
+                if isinstance(listing, dict) and listing.get('url'):
+                    listings.append(listing)
+        
+        return listings
+    
+    def _apply_journal(self, existing_data: Dict[str, Dict], journal: Optional[List[Dict]] = None) -> int:
+        """
+        Replay journaled listings onto existing data (merge if URL exists, add otherwise)
+        
+        Args:
+            existing_data: Data read from the CSV, keyed by URL (updated in place)
+            journal: Already loaded journal entries (read from disk if None)
+            
+        Returns:
+            Number of journal entries applied
+        """
+        if journal is None:
+            journal = self._load_journal()
+        
+        for listing in journal:
+            url = listing['url']
+            if url in existing_data:
+                existing_data[url] = self._merge_listing_data(existing_data[url], listing)
+            else:
+                existing_data[url] = listing
+        
+        return len(journal)
+    
+    def _clear_journal(self) -> None:
+        """Remove the journal once its entries have been written to the CSV"""
+        try:
+            self.journal_path.unlink(missing_ok=True)
+        except OSError:
+            # Never leave stale entries behind to be replayed over newer data
+            with open(self.journal_path, 'wb'):
+                pass
+    
+    def _get_lock_fd(self) -> int:
+        """Descriptor of the persistent lock file next to the current CSV (opened once per path)"""
+        lock_path = self.filepath.with_suffix('.lock')
+        fd = self._lock_fds.get(lock_path)
+        if fd is None:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+            self._lock_fds[lock_path] = fd
+        return fd
+    
+    @contextlib.asynccontextmanager
+    async def _locked(self):
+        """Hold the CSV write lock; blocks in the kernel instead of polling for a lock file"""
+        async with self._write_lock:
+            fd = self._get_lock_fd()
+            if fcntl is not None:
+                acquire = asyncio.ensure_future(asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX))
+                try:
+                    await asyncio.shield(acquire)
+                except asyncio.CancelledError:
+                    # The worker thread can't be interrupted: wait for it to take the
+                    # flock and release it before propagating, so it is never leaked
+                    while not acquire.done():
+                        with contextlib.suppress(asyncio.CancelledError):
+                            await asyncio.wait((acquire,))
+                    if not acquire.cancelled() and acquire.exception() is None:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    raise
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+    
+    def close(self) -> None:
+        """Close the lock file descriptors"""
+        for fd in self._lock_fds.values():
+            try:
+                os.close(fd)
+            except OSError as e:
+                logger.debug(f"Error closing lock file: {e}")
+        self._lock_fds.clear()
     
     async def save_single_listing(
         self,
@@ -404,99 +670,174 @@ class CSVStorageManager:
             logger.warning(f"Skipping save: Technical error detected: {error_msg[:100]}...")
             return
         
-        # Use a lock file to prevent concurrent writes
-        lock_file = self.filepath.with_suffix('.lock')
+        # Lock to prevent concurrent writes
+        async with self._locked():
+            try:
+                # Journal the listing (one small append) and only rewrite the CSV
+                # once the journal has grown past journal_max_bytes; both writes run
+                # off the event loop so a slow disk doesn't stall the scraping coroutines
+                journal_size = await asyncio.to_thread(self._append_journal, listing)
+                logger.debug(f"Journaled listing: {listing_url} (journal size: {journal_size} bytes)")
+                
+                if journal_size > self.journal_max_bytes:
+                    await asyncio.to_thread(self._compact_journal)
+            except Exception as e:
+                logger.error(f"Error saving listing {listing_url}: {e}", exc_info=True)
+                raise
+    
+    def _read_header(self) -> List[str]:
+        """Raw header row of the CSV file (unfiltered, in file order)"""
+        with open(self.filepath, 'r', newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+    
+    def _append_new_listings(
+        self,
+        csv_data: Dict[str, Dict],
+        csv_fieldnames: List[str],
+        listings: List[Dict]
+    ) -> bool:
+        """
+        Append listings as new rows when that is equivalent to a full rewrite
         
-        # Wait for lock to be released
-        await self._acquire_lock(lock_file)
+        Only applies when every listing has a URL not yet in the CSV (and unique among
+        them) and only uses columns the CSV header already has, so the header and the
+        existing rows stay untouched. New rows go at the end, as a rewrite would put them.
         
-        try:
-            # Create lock file
-            lock_file.touch(exist_ok=True)
-            
-            # Read ALL existing data from CSV
-            existing_data, existing_fieldnames = self._read_existing_data()
-            
-            # Check if this listing already exists
-            is_update = listing_url in existing_data
-            
-            if is_update:
-                # Merge with existing data - preserve ALL existing fields
-                logger.info(f"Updating existing listing: {listing_url}")
-                existing_data[listing_url] = self._merge_listing_data(existing_data[listing_url], listing)
-            else:
-                # New listing - add it
-                logger.info(f"Adding new listing: {listing_url}")
-                existing_data[listing_url] = listing.copy()
-            
-            # Collect ALL fieldnames from ALL listings (existing + new)
-            # CRITICAL: Preserve existing fieldnames first to maintain column structure
-            # This prevents losing columns when updating with deep search data
-            all_fieldnames: Set[str] = set()
-            
-            # First, add fieldnames from existing data (preserve existing structure)
-            # This ensures we don't lose columns when updating
-            for listing_data in existing_data.values():
-                for key in listing_data.keys():
-                    if self.is_valid_fieldname(key):
-                        all_fieldnames.add(key)
-            
-            # Then, add fieldnames from new listing (these may add new columns)
-            for key in listing.keys():
-                if self.is_valid_fieldname(key):
-                    all_fieldnames.add(key)
-            
-            # Sort fieldnames for consistent output
-            all_fieldnames = sorted(all_fieldnames)
-            
-            # CRITICAL: Ensure we have valid fieldnames before writing
-            if not all_fieldnames:
-                logger.error("No valid fieldnames found! Cannot write CSV without headers.")
-                return
-            
-            # Write ALL data back to CSV (preserving ALL existing listings and data)
-            # ALWAYS write header - this is critical!
-            written_count = 0
-            with open(self.filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=all_fieldnames)
-                # ALWAYS write header - never skip this!
-                writer.writeheader()
-                
-                # Write all listings in sorted order (by URL) for consistency
-                # Sort by URL if available, otherwise by key
-                def sort_key(item):
-                    url_key, listing_data = item
-                    url = listing_data.get('url', '')
-                    if url:
-                        return (0, url)  # Entries with URL come first, sorted by URL
-                    else:
-                        return (1, url_key)  # Entries without URL come after, sorted by key
-                
-                for url_key, listing_data in sorted(existing_data.items(), key=sort_key):
-                    # Convert listing to row format
-                    row = self.convert_result_to_row(listing_data)
-                    
-                    # Ensure ALL fieldnames are present in row (fill missing with None)
-                    for fieldname in all_fieldnames:
-                        if fieldname not in row:
-                            row[fieldname] = None
-                    
-                    writer.writerow(row)
-                    written_count += 1
+        Args:
+            csv_data: Current CSV data keyed by URL
+            csv_fieldnames: Valid fieldnames of the CSV header
+            listings: Listings to add
             
-            action = "Updated" if is_update else "Added"
-            logger.info(f"{action} listing in CSV: {listing_url} ({len(all_fieldnames)} columns, {written_count} total listings)")
+        Returns:
+            True if the listings were appended, False if a full rewrite is needed
+        """
+        if not listings or not csv_fieldnames:
+            return False
+        
+        known_columns = frozenset(csv_fieldnames)
+        urls = set()
+        for listing in listings:
+            url = str(listing['url']).strip()
+            if not url or url in csv_data or url in urls:
+                return False
+            urls.add(url)
+            # Keys outside the header: fine only if they are invalid (never written)
+            if any(self.is_valid_fieldname(k) for k in listing.keys() - known_columns):
+                return False
+        
+        # Positional rows must line up with the header exactly
+        if self._read_header() != csv_fieldnames:
+            return False
+        
+        # The last row must be terminated, or the first appended row would join it
+        with open(self.filepath, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                return False
+        
+        key_before = self._csv_stat_key()
+        convert = self._convert_value
+        rows = [tuple(convert(listing.get(fieldname)) for fieldname in csv_fieldnames) for listing in listings]
+        with open(self.filepath, 'a', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+            csv.writer(f).writerows(rows)
+        
+        # Extend the read cache with the appended rows instead of dropping it
+        cache = self._cache
+        key = self._csv_stat_key()
+        if cache is not None and key is not None and cache[0] == key_before:
+            data = dict(cache[1])
+            for row in rows:
+                read_row = self._row_as_read(row, csv_fieldnames)
+                data[read_row['url']] = read_row
+            self._cache = (key, data, cache[2])
+        else:
+            self._cache = None
+        
+        return True
+    
+    def _write_listings(self, path: Path, listings: Dict[str, Dict], fieldnames: List[str]) -> List[Tuple]:
+        """
+        Write listings to path with a header, in the dict's insertion order
+        
+        Existing rows keep their file position (updates replace values in place) and new
+        listings follow in arrival order, so no O(N log N) sort is needed per rewrite and
+        the order matches rows added by the append fast path.
+        
+        Rows are positional tuples in fieldnames order written with csv.writer, so there is
+        no per-column dict lookup or extra-key check as with csv.DictWriter.
+        
+        Args:
+            path: File to (over)write
+            listings: Listings keyed by URL (or index key for rows without URL)
+            fieldnames: Valid fieldnames, in column order
             
-        except Exception as e:
-            logger.error(f"Error saving listing {listing_url}: {e}", exc_info=True)
-            raise
-        finally:
-            # Remove lock file
-            try:
-                if lock_file.exists():
-                    lock_file.unlink()
-            except Exception as e:
-                logger.debug(f"Error removing lock file: {e}")
+        Returns:
+            Rows written, excluding the header
+        """
+        convert = self._convert_value
+        rows = [
+            tuple(convert(listing_data.get(fieldname)) for fieldname in fieldnames)
+            for listing_data in listings.values()
+        ]
+        
+        with open(path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            # ALWAYS write header - never skip this!
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
+        
+        return rows
+    
+    def _compact_journal(self) -> None:
+        """
+        Fold the journal into the CSV: read CSV + journal, merge, rewrite the CSV once.
+        Must be called while holding the write lock.
+        """
+        if not self.journal_path.exists():
+            return
+        
+        csv_data, csv_fieldnames = self._read_csv_data()
+        journal = self._load_journal()
+        
+        # Fast path: only new listings whose columns the CSV already has, append them
+        if self._append_new_listings(csv_data, csv_fieldnames, journal):
+            self._clear_journal()
+            logger.info(f"Appended {len(journal)} journaled listings to CSV ({len(csv_data) + len(journal)} total listings)")
+            return
+        
+        # Read ALL existing data from CSV, with journaled listings merged in
+        existing_data = csv_data
+        self._apply_journal(existing_data, journal)
+        
+        # Collect ALL fieldnames (existing + journaled), sorted for consistent output
+        # This prevents losing columns when updating with deep search data
+        # Parsed CSV rows carry exactly the header's valid columns, so only the
+        # journaled listings need scanning, not every existing row
+        all_fieldnames = sorted(set(csv_fieldnames).union(self.get_all_fieldnames(journal)))
+        
+        # CRITICAL: Ensure we have valid fieldnames before writing
+        if not all_fieldnames:
+            logger.error("No valid fieldnames found! Cannot write CSV without headers.")
+            return
+        
+        # Write ALL data back to CSV (preserving ALL existing listings and data)
+        # into a temp file that replaces the CSV atomically, so readers never see
+        # a half-written file
+        # ALWAYS write header - this is critical!
+        written_rows = self._write_listings(self.tmp_path, existing_data, all_fieldnames)
+        os.replace(self.tmp_path, self.filepath)
+        
+        self._remember_written(written_rows, all_fieldnames)
+        self._clear_journal()
+        logger.info(f"Saved journaled listings to CSV ({len(all_fieldnames)} columns, {len(written_rows)} total listings)")
+    
+    async def compact(self) -> None:
+        """Write any journaled single-listing saves into the CSV (call when a run finishes)"""
+        if not self.journal_path.exists():
+            return
+        
+        async with self._locked():
+            await asyncio.to_thread(self._compact_journal)
     
     def save_page_listings(
         self,
@@ -532,19 +873,35 @@ class CSVStorageManager:
         self.ensure_csv_headers(all_fieldnames)
         
         # Append page listings to CSV
-        with open(self.filepath, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=all_fieldnames)
-            
-            for listing in page_listings:
-                row = self.convert_result_to_row(listing)
-                # Ensure all fieldnames are present in row
-                for fieldname in all_fieldnames:
-                    if fieldname not in row:
-                        row[fieldname] = None
-                writer.writerow(row)
+        convert = self._convert_value
+        with open(self.filepath, 'a', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+            # Rows are positional in header order; missing fields become empty cells
+            csv.writer(f).writerows(
+                tuple(convert(listing.get(fieldname)) for fieldname in all_fieldnames)
+                for listing in page_listings
+            )
         
         logger.info(f"Saved {len(page_listings)} listings from page {page_num} to {self.filepath}")
     
+    async def save_page_listings_async(
+        self,
+        page_num: int,
+        page_listings: List[Dict]
+    ) -> None:
+        """
+        Save a page of listings like save_page_listings, from a coroutine
+        
+        The append runs in a worker thread under the CSV write lock, so it neither
+        blocks the event loop nor lands in a file that a concurrent journal
+        compaction is about to replace.
+        
+        Args:
+            page_num: Page number that was scraped
+            page_listings: List of listings from this page
+        """
+        async with self._locked():
+            await asyncio.to_thread(self.save_page_listings, page_num, page_listings)
+    
     def save_listings_batch(
         self,
         listings: List[Dict]
@@ -553,6 +910,9 @@ class CSVStorageManager:
         Save a batch of listings to CSV, updating existing rows or appending new ones.
         Preserves ALL existing data and merges new deep search data correctly.
         
+        Takes no lock: while coroutines may be saving to the same CSV, use
+        save_listings_batch_async instead.
+        
         Args:
             listings: List of listings to save (from deep search)
         """
@@ -560,8 +920,22 @@ class CSVStorageManager:
             logger.debug("No listings to save")
             return
         
-        # Read ALL existing data first
-        existing_data, existing_fieldnames = self._read_existing_data()
+        for listing in listings:
+            if not listing.get('url'):
+                logger.warning(f"Skipping listing without URL: {listing.get('title', 'Unknown')}")
+        listings = [listing for listing in listings if listing.get('url')]
+        
+        # Read ALL existing data first (CSV plus pending journal entries)
+        existing_data, existing_fieldnames = self._read_csv_data()
+        journal = self._load_journal()
+        
+        # Fast path: only new listings whose columns the CSV already has, append them
+        # (pending journal entries are folded in by the next compaction)
+        if not journal and self._append_new_listings(existing_data, existing_fieldnames, listings):
+            logger.info(f"Saved batch: 0 updated, {len(listings)} added, {len(existing_data) + len(listings)} total listings, {len(existing_fieldnames)} columns")
+            return
+        
+        self._apply_journal(existing_data, journal)
         
         # Track updates and additions
         updated_count = 0
@@ -569,11 +943,7 @@ class CSVStorageManager:
         
         # Merge new listings with existing data
         for listing in listings:
-            url = listing.get('url')
-            if not url:
-                logger.warning(f"Skipping listing without URL: {listing.get('title', 'Unknown')}")
-                continue
-            
+            url = listing['url']
             if url in existing_data:
                 # Update existing listing - preserve all existing data
                 existing_data[url] = self._merge_listing_data(existing_data[url], listing)
@@ -584,61 +954,51 @@ class CSVStorageManager:
                 added_count += 1
         
         # Collect ALL fieldnames from ALL listings
+        # (parsed CSV rows only carry the header's columns, so scan just the added data)
         all_fieldnames: Set[str] = set(existing_fieldnames)
-        for listing_data in existing_data.values():
-            for key in listing_data.keys():
-                if self.is_valid_fieldname(key):
-                    all_fieldnames.add(key)
+        all_fieldnames.update(self.get_all_fieldnames(journal))
+        all_fieldnames.update(self.get_all_fieldnames(listings))
         
         # Sort fieldnames for consistent output
         all_fieldnames = sorted(all_fieldnames)
         
         # CRITICAL: Ensure we have valid fieldnames before writing
+        # (existing_fieldnames and get_all_fieldnames are already filtered)
         if not all_fieldnames:
             logger.error("No valid fieldnames found! Cannot write CSV without headers.")
             return
         
-        # Filter out generic column_* names - they should be replaced with real fieldnames
-        all_fieldnames = [f for f in all_fieldnames if self.is_valid_fieldname(f)]
+        # Write ALL data back to CSV (preserving ALL existing listings and data),
+        # atomically replacing the file
+        written_rows = self._write_listings(self.tmp_path, existing_data, all_fieldnames)
+        os.replace(self.tmp_path, self.filepath)
         
-        if not all_fieldnames:
-            logger.error("No valid fieldnames after filtering! Cannot write CSV.")
-            return
+        self._remember_written(written_rows, all_fieldnames)
+        # Journaled listings were merged in by _apply_journal
+        self._clear_journal()
+        logger.info(f"Saved batch: {updated_count} updated, {added_count} added, {len(existing_data)} total listings, {len(all_fieldnames)} columns")
+    
+    async def save_listings_batch_async(self, listings: List[Dict]) -> None:
+        """
+        Save a batch of listings like save_listings_batch, from a coroutine
         
-        # Write ALL data back to CSV (preserving ALL existing listings and data)
-        # ALWAYS write header - this is critical!
-        with open(self.filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=all_fieldnames)
-            # ALWAYS write header - never skip this!
-            writer.writeheader()
-            
-            # Write all listings in sorted order (by URL) for consistency
-            # Sort by URL if available, otherwise by key
-            def sort_key(listing_data):
-                url = listing_data.get('url', '')
-                if url:
-                    return (0, url)  # Entries with URL come first, sorted by URL
-                else:
-                    # For entries without URL, try to find a key in existing_data
-                    for key, data in existing_data.items():
-                        if data is listing_data:
-                            return (1, key)  # Entries without URL come after, sorted by key
-                    return (1, '')  # Fallback
-            
-            for listing_data in sorted(existing_data.values(), key=sort_key):
-                row = self.convert_result_to_row(listing_data)
-                # Ensure ALL fieldnames are present in row (fill missing with None)
-                for fieldname in all_fieldnames:
-                    if fieldname not in row:
-                        row[fieldname] = None
-                writer.writerow(row)
+        The merge and rewrite run in a worker thread under the CSV write lock, so a
+        concurrent journal append or compaction can neither be dropped when the
+        journal is cleared nor share the temp file.
         
-        logger.info(f"Saved batch: {updated_count} updated, {added_count} added, {len(existing_data)} total listings, {len(all_fieldnames)} columns")
+        Args:
+            listings: List of listings to save (from deep search)
+        """
+        async with self._locked():
+            await asyncio.to_thread(self.save_listings_batch, listings)
     
     def save_results(self, results: List[Dict]) -> None:
         """
         Save results to CSV file, flattening search results if needed
         
+        Takes no lock: while coroutines may be saving to the same CSV, use
+        save_results_async instead.
+        
         Args:
             results: List of results (may contain search_results with listings)
         """
@@ -646,13 +1006,22 @@ class CSVStorageManager:
             logger.warning("No results to save")
             return
         
-        # Flatten search results
-        flattened_results = []
-        for result in results:
-            if result.get("type") == "search_results" and "listings" in result:
-                flattened_results.extend(result.get("listings", []))
-            else:
-                flattened_results.append(result)
+        # Flatten search results (already-flat results are used as they are)
+        is_search_results = [
+            result.get("type") == "search_results" and "listings" in result
+            for result in results
+        ]
+        if any(is_search_results):
+            flattened_results = []
+            extend = flattened_results.extend
+            append = flattened_results.append
+            for result, nested in zip(results, is_search_results):
+                if nested:
+                    extend(result["listings"])
+                else:
+                    append(result)
+        else:
+            flattened_results = results
         
         if not flattened_results:
             logger.warning("No results to save after flattening")
@@ -661,14 +1030,65 @@ class CSVStorageManager:
         # Get all fieldnames
         fieldnames = self.get_all_fieldnames(flattened_results)
         
-        # Write to CSV
-        with open(self.filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for result in flattened_results:
-                row = self.convert_result_to_row(result)
-                writer.writerow(row)
+        # Write to CSV (through a temp file that atomically replaces it)
+        convert = self._convert_value
+        with open(self.tmp_path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                tuple(convert(result.get(fieldname)) for fieldname in fieldnames)
+                for result in flattened_results
+            )
+        os.replace(self.tmp_path, self.filepath)
         
+        # The file now holds exactly these results; pending journal entries are superseded
+        self._clear_journal()
         logger.info(f"Saved {len(flattened_results)} listings to {self.filepath}")
-
+    
+    async def save_results_async(self, results: List[Dict]) -> None:
+        """
+        Save results like save_results, from a coroutine
+        
+        The rewrite runs in a worker thread under the CSV write lock, so journaled
+        saves made meanwhile are not cleared unwritten and no compaction shares the
+        temp file.
+        
+        Args:
+            results: List of results (may contain search_results with listings)
+        """
+        async with self._locked():
+            await asyncio.to_thread(self.save_results, results)
+    
+    def _write_gzip_export(self) -> Optional[Path]:
+        """
+        Compress the CSV into gzip_export_path (through a temp file, replaced atomically)
+        
+        Returns:
+            Path of the export, or None if there is no CSV yet
+        """
+        if not self.filepath.exists():
+            return None
+        
+        export_path = self.gzip_export_path
+        tmp_path = export_path.with_name(export_path.name + '.tmp')
+        with open(self.filepath, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=_GZIP_COMPRESSLEVEL) as dst:
+            shutil.copyfileobj(src, dst, _WRITE_BUFFER_SIZE)
+        os.replace(tmp_path, export_path)
+        return export_path
+    
+    async def export_gzip(self) -> Optional[Path]:
+        """
+        Write a gzip-compressed copy of the CSV next to it (e.g. scraped_data.csv.gz)
+        
+        The working CSV stays plain text, since appends, the journal and the mmap
+        scans all need it uncompressed. The copy is taken under the CSV write lock,
+        so it never contains a half-written row.
+        
+        Returns:
+            Path of the export, or None if there is no CSV yet
+        """
+        async with self._locked():
+            export_path = await asyncio.to_thread(self._write_gzip_export)
+        if export_path is not None:
+            logger.info(f"Exported gzip-compressed CSV to {export_path}")
+        return export_path
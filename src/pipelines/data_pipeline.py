@@ -117,6 +117,18 @@ class DataPipeline:
         self.csv_storage.filepath = self.csv_storage.output_dir / filename
         self.csv_storage.save_results(self.results)
     
+    async def save_to_csv_async(self, filename: str = DEFAULT_CSV_FILENAME) -> None:
+        """
+        Saves results to a CSV file like save_to_csv, under the CSV write lock
+        
+        Args:
+            filename: Output CSV filename
+        """
+        # Delegate to CSV storage
+        self.csv_storage.filename = filename
+        self.csv_storage.filepath = self.csv_storage.output_dir / filename
+        await self.csv_storage.save_results_async(self.results)
+    
     async def save_single_listing_to_csv(
         self,
         listing: Dict,
@@ -183,7 +195,9 @@ class DataPipeline:
         await self.process_urls()
         
         # Save to CSV
-        self.save_to_csv()
+        await self.save_to_csv_async()
+        if Config.CSV_GZIP_EXPORT:
+            await self.csv_storage.export_gzip()
         
         # Images are already downloaded during deep scraping in process_urls()
         # No need to download them again here
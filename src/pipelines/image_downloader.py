@@ -4,40 +4,84 @@ Manages image downloads, directory creation, and rate limiting
 """
 import asyncio
 import logging
+import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
-import aiofiles
 import aiohttp
 
 from src.config import Config
+from src.core.proxy_manager import ProxyManager
+from src.core.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Images up to this size are read whole and written with a single call;
+# larger or unknown-size responses are streamed to disk in chunks
+MAX_BUFFERED_IMAGE_BYTES = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Responses larger than this are not images worth keeping and are skipped
+MAX_IMAGE_BYTES = 50 * 1024 * 1024
+
+# Generic binary types (application/, binary/) that CDNs serve images as; aiohttp
+# also reports application/octet-stream when the server sends no content type
+_OCTET_STREAM_SUFFIX = '/octet-stream'
+
+_VALID_IMAGE_EXTENSIONS = frozenset(('jpg', 'jpeg', 'png', 'gif', 'webp'))
+
+_LISTING_ID_RE = re.compile(r'id-(\d+)')
+_UNSAFE_NAME_CHARS_RE = re.compile(r'[^\w\-_\.]')
+
 
 class ImageDownloader:
     """Manages asynchronous image downloads for listings"""
     
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        proxy_manager: Optional[ProxyManager] = None,
+        max_concurrent: int = 4
+    ):
         """
         Initialize Image Downloader
         
         Args:
             output_dir: Base output directory where images will be stored
+            proxy_manager: Optional ProxyManager; when proxies are enabled, images are
+                downloaded through its shared per-proxy sessions
+            max_concurrent: Maximum number of images of a listing downloaded at once
         """
         self.output_dir = Path(output_dir)
+        self.proxy_manager = proxy_manager
+        self.max_concurrent = max(1, max_concurrent)
+        
+        # Settings read per listing/image, looked up once
+        self._save_images = bool(Config.SAVE_IMAGES)
+        
+        # One limiter for the whole run, so concurrent listings share the request budget
+        rate = float(Config.IMAGE_DOWNLOAD_RATE)
+        self._rate_limiter = RateLimiter(rate) if rate > 0 else None
+        
+        # Direct (non-proxy) session shared by all listings, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
         self.images_dir = self.output_dir / "images"
         self.images_dir.mkdir(parents=True, exist_ok=True)
+        # Length of the output_dir prefix sliced off saved image paths to make them relative
+        # (taken from images_dir, which also covers output_dir "." rendering as "")
+        self._output_prefix_len = len(str(self.images_dir)) - len(self.images_dir.name)
+        
+        # Listing directories already created, so repeat listings skip the mkdir syscalls
+        self._created_dirs: Set[Path] = set()
     
     def get_image_extension(self, image_url: str) -> str:
         """Extract and validate image file extension from URL"""
         if '.' not in image_url:
             return 'jpg'
         
-        ext = image_url.split('.')[-1].split('?')[0].lower()
-        valid_extensions = ['jpg', 'jpeg', 'png', 'gif', 'webp']
-        return ext if ext in valid_extensions else 'jpg'
+        ext = image_url.rpartition('.')[2].partition('?')[0].lower()
+        return ext if ext in _VALID_IMAGE_EXTENSIONS else 'jpg'
     
     def get_listing_id_from_url(self, url: str) -> str:
         """
@@ -53,7 +97,7 @@ class ImageDownloader:
             return "unknown"
         
         # Try to extract ID from URL
-        id_match = re.search(r'id-(\d+)', url)
+        id_match = _LISTING_ID_RE.search(url)
         if id_match:
             return f"listing_{id_match.group(1)}"
         
@@ -62,7 +106,7 @@ class ImageDownloader:
         if url_parts:
             last_part = url_parts[-1].split('?')[0]  # Remove query params
             # Sanitize for filesystem
-            safe_name = re.sub(r'[^\w\-_\.]', '_', last_part)
+            safe_name = _UNSAFE_NAME_CHARS_RE.sub('_', last_part)
             return safe_name[:50]  # Limit length
         
         return "unknown"
@@ -74,8 +118,8 @@ class ImageDownloader:
         
         # Handle case where images might be a string (from CSV)
         if isinstance(images, str):
-            # Split by comma and strip whitespace
-            return [img.strip() for img in images.split(',') if img.strip()]
+            # Split by comma and strip whitespace (once per item)
+            return [img for img in map(str.strip, images.split(',')) if img]
         
         if isinstance(images, list):
             return [str(img) for img in images if img]
@@ -106,31 +150,147 @@ class ImageDownloader:
         if index >= max_images:
             return None
         
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        
         try:
             async with session.get(image_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status != 200:
                     logger.debug(f"Failed to download image {image_url}: HTTP {response.status}")
                     return None
                 
+                # CDNs often answer failures with an HTML page and HTTP 200; skip those
+                # (and oversized bodies) before touching the disk. Untyped and generic
+                # binary bodies are kept and left to the size cap
+                content_type = response.content_type
+                if (content_type and not content_type.startswith('image/')
+                        and not content_type.endswith(_OCTET_STREAM_SUFFIX)):
+                    logger.debug(f"Skipping image {image_url}: unexpected content type {content_type}")
+                    return None
+                content_length = response.content_length
+                if content_length is not None and content_length > MAX_IMAGE_BYTES:
+                    logger.debug(f"Skipping image {image_url}: {content_length} bytes is too large")
+                    return None
+                
                 ext = self.get_image_extension(image_url)
                 filename = f"image_{index+1:03d}.{ext}"
                 filepath = output_path / filename
                 
                 # Save image content
-                async with aiofiles.open(filepath, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        await f.write(chunk)
+                if content_length is not None and content_length <= MAX_BUFFERED_IMAGE_BYTES:
+                    data = await response.read()
+                    await asyncio.to_thread(filepath.write_bytes, data)
+                elif not await self._stream_to_file(response, filepath):
+                    logger.debug(f"Skipping image {image_url}: body exceeds {MAX_IMAGE_BYTES} bytes")
+                    return None
                 
                 logger.debug(f"Downloaded image {index+1}/{max_images}: {filename}")
                 
                 # Calculate relative path
-                relative_path = filepath.relative_to(self.output_dir)
-                return str(relative_path).replace('\\', '/')  # Normalize path separators
+                relative_path = str(filepath)[self._output_prefix_len:]
+                return relative_path.replace(os.sep, '/')  # Normalize path separators
                 
         except Exception as e:
             logger.debug(f"Error downloading image {image_url}: {e}")
             return None
     
+    async def _stream_to_file(self, response: aiohttp.ClientResponse, filepath: Path) -> bool:
+        """
+        Stream a response body to disk, giving up once it exceeds MAX_IMAGE_BYTES
+        
+        Args:
+            response: Response to read the body from
+            filepath: File to write
+            
+        Returns:
+            True if the whole body was written, False if it was too large
+        """
+        written = 0
+        # File operations run in worker threads, like the buffered write, so a slow
+        # disk never stalls the event loop between chunks
+        f = await asyncio.to_thread(open, filepath, 'wb')
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_IMAGE_BYTES:
+                    break
+                await asyncio.to_thread(f.write, chunk)
+            else:
+                return True
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(filepath.unlink, missing_ok=True)
+        return False
+    
+    async def _get_proxy_session(self) -> Optional[aiohttp.ClientSession]:
+        """Get a shared session for the next proxy, or None to download directly"""
+        if not Config.PROXY_ENABLED or not self.proxy_manager or not self.proxy_manager.proxies:
+            return None
+        
+        proxy = await self.proxy_manager.get_proxy()
+        if proxy is None:
+            return None
+        return self.proxy_manager.get_session(proxy)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared direct session, creating it on first use
+        
+        Keeping one session for the whole run lets keep-alive connections to the
+        image CDN be reused across listings instead of a new handshake per listing.
+        
+        Returns:
+            aiohttp.ClientSession: Long-lived session (closed by close())
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=max(8, self.max_concurrent),
+                    ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Closes the shared direct session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _download_images(
+        self,
+        session: aiohttp.ClientSession,
+        images_list: List[str],
+        image_dir: Path,
+        max_images: int
+    ) -> List[str]:
+        """
+        Download a listing's images concurrently, at most max_concurrent at a time
+        
+        Args:
+            session: aiohttp session to download with
+            images_list: Image URLs, already capped to max_images
+            image_dir: Directory where to save the images
+            max_images: Maximum number of images to download
+            
+        Returns:
+            Relative paths of the downloaded images, in image order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        async def download(index: int, image_url: str) -> Optional[str]:
+            async with semaphore:
+                return await self._download_single_image(
+                    session, image_url, index, image_dir, max_images
+                )
+        
+        results = await asyncio.gather(
+            *(download(i, image_url) for i, image_url in enumerate(images_list))
+        )
+        return [relative_path for relative_path in results if relative_path]
+    
     async def download_listing_images(
         self,
         listing: Dict,
@@ -143,7 +303,7 @@ class ImageDownloader:
             listing: Listing dictionary with image URLs
             max_images: Maximum number of images to download per listing
         """
-        if not Config.SAVE_IMAGES:
+        if not self._save_images:
             logger.debug("SAVE_IMAGES is disabled, skipping image download")
             return
         
@@ -153,28 +313,24 @@ class ImageDownloader:
         if not images_list:
             logger.debug("No images found in listing")
             return
+        images_list = images_list[:max_images]
         
         listing_url = listing.get("url", "")
         listing_id = self.get_listing_id_from_url(listing_url)
         image_dir = self.images_dir / listing_id
-        image_dir.mkdir(parents=True, exist_ok=True)
+        if image_dir not in self._created_dirs:
+            image_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(image_dir)
         
-        logger.info(f"Downloading up to {min(len(images_list), max_images)} images to: {image_dir}")
+        logger.info(f"Downloading up to {len(images_list)} images to: {image_dir}")
         
-        # Download images with rate limiting
-        downloaded_paths = []
-        async with aiohttp.ClientSession() as session:
-            for i, image_url in enumerate(images_list[:max_images]):
-                relative_path = await self._download_single_image(
-                    session, image_url, i, image_dir, max_images
-                )
-                
-                if relative_path:
-                    downloaded_paths.append(relative_path)
-                
-                # Delay between downloads to avoid overwhelming the server
-                if i < len(images_list[:max_images]) - 1:
-                    await asyncio.sleep(Config.IMAGE_DOWNLOAD_DELAY)
+        # Reuse the long-lived proxy session when available, otherwise the shared direct session
+        session = await self._get_proxy_session()
+        if session is None:
+            session = self._get_session()
+        downloaded_paths = await self._download_images(
+            session, images_list, image_dir, max_images
+        )
         
         # Update listing with local image paths
         if downloaded_paths:
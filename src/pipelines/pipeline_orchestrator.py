@@ -4,9 +4,9 @@ Unifies normal and deep_search_only modes, manages concurrency and statistics
 """
 import asyncio
 import logging
-from typing import List, Dict, Optional, Callable, Awaitable
+from typing import Any, List, Dict, Optional, Callable, Awaitable
 
-from src.core.browser_manager import BrowserManager
+from src.core.browser_pool import BrowserPool
 from src.core.compliance_manager import ComplianceManager
 from src.core.human_behavior import HumanBehavior
 from src.core.proxy_manager import ProxyManager
@@ -18,6 +18,11 @@ from src.config import Config
 logger = logging.getLogger(__name__)
 
 
+def _normalize_listing_url(url: str) -> str:
+    """Normalize a listing URL for cache lookups (whitespace, case, query, trailing slash)"""
+    return url.strip().partition('#')[0].partition('?')[0].rstrip('/').lower()
+
+
 class PipelineOrchestrator:
     """Orchestrates the scraping pipeline flow"""
     
@@ -48,172 +53,55 @@ class PipelineOrchestrator:
         self.deep_search_only = deep_search_only
         
         # Initialize managers
-        self.csv_storage = CSVStorageManager(output_dir, Config.LISTINGS_CSV_FILENAME)
-        self.image_downloader = ImageDownloader(output_dir)
+        self.csv_storage = CSVStorageManager(
+            output_dir,
+            Config.LISTINGS_CSV_FILENAME,
+            journal_max_bytes=Config.CSV_JOURNAL_MAX_BYTES
+        )
+        self.image_downloader = ImageDownloader(
+            output_dir,
+            proxy_manager=proxy_manager,
+            max_concurrent=Config.IMAGE_DOWNLOAD_CONCURRENCY
+        )
         
-        # Cache for listings data (to avoid reading CSV multiple times)
+        # Cache for listings data, read from the CSV once on first use and kept
+        # up to date in memory afterwards (see _get_listings_cache)
         self._listings_cache: Optional[Dict[str, Dict]] = None
+        self._listings_cache_lock = asyncio.Lock()
+        # Normalized URL -> cache key, so variant spellings of a URL resolve in O(1)
+        self._listings_url_index: Dict[str, str] = {}
         
-        # Create save callback for deep search (merges and saves immediately to scraped_data.csv)
-        async def save_deep_search_callback(listing: Dict) -> None:
-            """Callback to merge and save deep search results immediately to scraped_data.csv"""
-            listing_url = listing.get('url', 'unknown')
-            logger.info(f"Deep search callback called for: {listing_url}")
-            
-            # Download images if enabled
-            if Config.SAVE_IMAGES:
-                images = listing.get("images")
-                if images:
-                    logger.info(f"Found {len(images) if isinstance(images, list) else 'unknown'} images for listing {listing.get('url', 'unknown')}")
-                    await self.image_downloader.download_listing_images(listing)
-                else:
-                    logger.debug(f"No images found for listing {listing.get('url', 'unknown')}")
-            
-            # Load listings data if not already loaded
-            if self._listings_cache is None:
-                self._listings_cache, _ = self.csv_storage._read_existing_data()
-                logger.info(f"Loaded {len(self._listings_cache)} listings from {Config.LISTINGS_CSV_FILENAME} for deep search updates")
-            
-            listing_url = listing.get('url')
-            if not listing_url:
-                logger.warning(f"Deep search result has no URL, skipping save")
-                return
-            
-            # Check if cache is empty
-            if not self._listings_cache:
-                logger.warning(f"Listings cache is empty! Cannot update listing {listing_url}. Make sure scraped_data.csv has listings first.")
-                return
-            
-            # Normalize URL for comparison (remove trailing slashes, etc.)
-            listing_url_normalized = listing_url.strip().rstrip('/')
-            
-            # Try to find URL in cache (exact match first, then normalized)
-            existing_listing = None
-            cache_key = None
-            
-            if listing_url in self._listings_cache:
-                cache_key = listing_url
-                existing_listing = self._listings_cache[listing_url]
-            elif listing_url_normalized in self._listings_cache:
-                cache_key = listing_url_normalized
-                existing_listing = self._listings_cache[listing_url_normalized]
-            else:
-                # Try to find by matching any URL in cache that contains the listing URL
-                for cached_url, cached_data in self._listings_cache.items():
-                    if cached_url and (listing_url in cached_url or cached_url in listing_url):
-                        cache_key = cached_url
-                        existing_listing = cached_data
-                        logger.debug(f"Found URL match: {listing_url} matches {cached_url}")
-                        break
-            
-            if existing_listing and cache_key:
-                # Merge deep search data with existing listing data
-                merged_listing = self.csv_storage._merge_listing_data(
-                    existing_listing,
-                    listing
-                )
-                # Update cache with merged data
-                self._listings_cache[cache_key] = merged_listing
-                # Save merged listing immediately to scraped_data.csv
-                try:
-                    await self.csv_storage.save_single_listing(merged_listing)
-                    logger.info(f"✓ Updated listing {listing_url} with deep search data in {Config.LISTINGS_CSV_FILENAME}")
-                except Exception as e:
-                    logger.error(f"Error saving listing {listing_url}: {e}", exc_info=True)
-                    raise  # Re-raise to see the error
-            else:
-                # Listing not found in scraped_data.csv
-                logger.warning(f"Listing {listing_url} not found in {Config.LISTINGS_CSV_FILENAME} (cache has {len(self._listings_cache)} entries), skipping (deep search only updates existing listings)")
-                # Log first few URLs in cache for debugging
-                if self._listings_cache:
-                    sample_urls = list(self._listings_cache.keys())[:3]
-                    logger.debug(f"Sample URLs in cache: {sample_urls}")
-                    # Also log the listing URL for comparison
-                    logger.debug(f"Looking for URL: {listing_url}")
-        
-        # Create save callback for initial listings (only used in deep_search_only mode)
-        async def save_listing_callback(listing: Dict) -> None:
-            """Callback to merge and save listing data immediately to scraped_data.csv (for deep_search_only mode)"""
-            # Download images if enabled
-            if Config.SAVE_IMAGES:
-                images = listing.get("images")
-                if images:
-                    logger.info(f"Found {len(images) if isinstance(images, list) else 'unknown'} images for listing {listing.get('url', 'unknown')}")
-                    await self.image_downloader.download_listing_images(listing)
-                else:
-                    logger.debug(f"No images found for listing {listing.get('url', 'unknown')}")
-            
-            # Load listings data if not already loaded (for deep_search_only mode)
-            if self._listings_cache is None:
-                self._listings_cache, _ = self.csv_storage._read_existing_data()
-                logger.info(f"Loaded {len(self._listings_cache)} listings from {Config.LISTINGS_CSV_FILENAME} for deep search updates")
-            
-            listing_url = listing.get('url')
-            if not listing_url:
-                logger.warning(f"Deep search result has no URL, skipping save")
-                return
-            
-            # Normalize URL for comparison (remove trailing slashes, etc.)
-            listing_url_normalized = listing_url.strip().rstrip('/')
-            
-            # Try to find URL in cache (exact match first, then normalized)
-            existing_listing = None
-            cache_key = None
-            
-            if listing_url in self._listings_cache:
-                cache_key = listing_url
-                existing_listing = self._listings_cache[listing_url]
-            elif listing_url_normalized in self._listings_cache:
-                cache_key = listing_url_normalized
-                existing_listing = self._listings_cache[listing_url_normalized]
-            else:
-                # Try to find by matching any URL in cache that contains the listing URL
-                for cached_url, cached_data in self._listings_cache.items():
-                    if cached_url and (listing_url in cached_url or cached_url in listing_url):
-                        cache_key = cached_url
-                        existing_listing = cached_data
-                        logger.debug(f"Found URL match: {listing_url} matches {cached_url}")
-                        break
-            
-            if existing_listing and cache_key:
-                # Merge deep search data with existing listing data
-                merged_listing = self.csv_storage._merge_listing_data(
-                    existing_listing,
-                    listing
-                )
-                # Update cache with merged data
-                self._listings_cache[cache_key] = merged_listing
-                # Save merged listing immediately to scraped_data.csv
-                try:
-                    await self.csv_storage.save_single_listing(merged_listing)
-                    logger.info(f"✓ Updated listing {listing_url} with deep search data in {Config.LISTINGS_CSV_FILENAME}")
-                except Exception as e:
-                    logger.error(f"Error saving listing {listing_url}: {e}", exc_info=True)
-            else:
-                # Listing not found in scraped_data.csv
-                logger.warning(f"Listing {listing_url} not found in {Config.LISTINGS_CSV_FILENAME} (cache has {len(self._listings_cache)} entries), skipping (deep search only updates existing listings)")
-                # Log first few URLs in cache for debugging
-                if self._listings_cache:
-                    sample_urls = list(self._listings_cache.keys())[:3]
-                    logger.debug(f"Sample URLs in cache: {sample_urls}")
+        # Listings whose images are downloaded in the background by _image_worker tasks,
+        # started on first use and drained by _finish_image_downloads
+        self._image_queue: asyncio.Queue = asyncio.Queue()
+        self._image_workers: List[asyncio.Task] = []
         
         # Create page callback for search results
         async def page_callback(page_num: int, page_listings: List[Dict], base_url: str) -> None:
             """Callback to save page data immediately after scraping"""
+            # Keep an already loaded cache in step with the CSV instead of re-reading it
+            # (updated before the save awaits, so deep search callbacks never miss these listings)
+            if self._listings_cache is not None:
+                for page_listing in page_listings:
+                    page_url = page_listing.get('url')
+                    if page_url and page_url not in self._listings_cache:
+                        self._listings_cache[page_url] = self.csv_storage.convert_result_to_row(page_listing)
+                        self._listings_url_index.setdefault(_normalize_listing_url(page_url), page_url)
+            
             # Save to scraped_data.csv
-            self.csv_storage.save_page_listings(page_num, page_listings)
+            await self.csv_storage.save_page_listings_async(page_num, page_listings)
         
         # Initialize URL processor
-        # In deep_search_only mode, use save_listing_callback
-        # In normal mode, use deep_search_callback for deep scraping (updates scraped_data.csv)
+        # Deep search results are merged into scraped_data.csv by _merge_and_save, passed as
+        # save_callback in deep_search_only mode and as deep_search_callback in normal mode
         self.url_processor = URLProcessor(
             compliance_manager=compliance_manager,
             human_behavior=human_behavior,
             proxy_manager=proxy_manager,
             deep_search_only=deep_search_only,
-            save_callback=save_listing_callback if deep_search_only else None,
+            save_callback=self._merge_and_save if deep_search_only else None,
             page_callback=page_callback,
-            deep_search_callback=save_deep_search_callback if not deep_search_only else None  # Only use in normal mode
+            deep_search_callback=self._merge_and_save if not deep_search_only else None  # Only use in normal mode
         )
         
         # Statistics
@@ -225,6 +113,153 @@ class PipelineOrchestrator:
             "skipped": 0
         }
     
+    async def _get_listings_cache(self) -> Dict[str, Dict]:
+        """
+        Get the listings cache, reading scraped_data.csv only on first use
+        
+        Concurrent deep search callbacks that miss at the same time wait for a
+        single read instead of each parsing the CSV.
+        
+        Returns:
+            Listings keyed by URL
+        """
+        if self._listings_cache is None:
+            async with self._listings_cache_lock:
+                if self._listings_cache is None:
+                    listings_cache, _ = self.csv_storage._read_existing_data()
+                    self._listings_url_index = {}
+                    for cached_url in listings_cache:
+                        if cached_url:
+                            self._listings_url_index.setdefault(_normalize_listing_url(cached_url), cached_url)
+                    self._listings_cache = listings_cache
+                    logger.info(f"Loaded {len(self._listings_cache)} listings from {Config.LISTINGS_CSV_FILENAME} for deep search updates")
+        return self._listings_cache
+    
+    def _find_cache_key(self, listing_url: str) -> Optional[str]:
+        """
+        Find the key of a listing in the loaded listings cache
+        
+        Args:
+            listing_url: URL of the listing, possibly spelled differently than in the CSV
+            
+        Returns:
+            Cache key of the listing, or None if it is not cached
+        """
+        if listing_url in self._listings_cache:
+            return listing_url
+        return self._listings_url_index.get(_normalize_listing_url(listing_url))
+    
+    async def _merge_and_save(self, listing: Dict) -> None:
+        """
+        Merge a deep search result into its listing and save it immediately to scraped_data.csv
+        
+        Images are queued for download in the background; their local paths are
+        merged and saved once they are on disk.
+        
+        Args:
+            listing: Deep scraped listing data
+        """
+        listing_url = listing.get('url', 'unknown')
+        logger.debug(f"Deep search callback called for: {listing_url}")
+        
+        # Queue images if enabled, so scraping doesn't wait for the image bytes
+        if Config.SAVE_IMAGES:
+            images = listing.get("images")
+            if images:
+                logger.debug(f"Found {len(images) if isinstance(images, list) else 'unknown'} images for listing {listing.get('url', 'unknown')}, queued for download")
+                self._queue_image_download(listing)
+            else:
+                logger.debug(f"No images found for listing {listing.get('url', 'unknown')}")
+        
+        await self._save_merged(listing)
+    
+    def _queue_image_download(self, listing: Dict) -> None:
+        """Queue a listing's images for the background image workers, starting them on first use"""
+        if not self._image_workers:
+            self._image_workers = [
+                asyncio.create_task(self._image_worker())
+                for _ in range(max(1, self.max_concurrent))
+            ]
+        self._image_queue.put_nowait(listing)
+    
+    async def _image_worker(self) -> None:
+        """Download queued listings' images and save their local paths"""
+        while True:
+            listing = await self._image_queue.get()
+            try:
+                await self.image_downloader.download_listing_images(listing)
+                if listing.get('images_local'):
+                    await self._save_merged({
+                        'url': listing.get('url'),
+                        'images_local': listing['images_local'],
+                        'images_local_count': listing['images_local_count']
+                    })
+            except Exception as e:
+                logger.warning(f"Error downloading images for listing {listing.get('url', 'unknown')}: {e}")
+            finally:
+                self._image_queue.task_done()
+    
+    async def _finish_image_downloads(self) -> None:
+        """Wait for the queued image downloads and stop the image workers"""
+        if not self._image_workers:
+            return
+        
+        await self._image_queue.join()
+        for worker in self._image_workers:
+            worker.cancel()
+        await asyncio.gather(*self._image_workers, return_exceptions=True)
+        self._image_workers = []
+    
+    async def _save_merged(self, listing: Dict) -> None:
+        """
+        Merge listing data into its cached listing and save the result to scraped_data.csv
+        
+        Args:
+            listing: Listing data with a URL (deep search result or downloaded image paths)
+        """
+        await self._get_listings_cache()
+        
+        listing_url = listing.get('url')
+        if not listing_url:
+            logger.warning(f"Deep search result has no URL, skipping save")
+            return
+        
+        # Check if cache is empty
+        if not self._listings_cache:
+            logger.warning(f"Listings cache is empty! Cannot update listing {listing_url}. Make sure scraped_data.csv has listings first.")
+            return
+        
+        # Lookup, merge and cache update below must not await: without a suspension point the
+        # read-modify-write is atomic on the event loop, so concurrent callbacks for the same
+        # listing cannot interleave (CSV writes are serialized by CSVStorageManager's lock)
+        
+        # Try to find URL in cache (exact match first, then normalized)
+        cache_key = self._find_cache_key(listing_url)
+        existing_listing = self._listings_cache.get(cache_key) if cache_key else None
+        
+        if existing_listing and cache_key:
+            # Merge deep search data with existing listing data
+            merged_listing = self.csv_storage._merge_listing_data(
+                existing_listing,
+                listing
+            )
+            # Update cache with merged data
+            self._listings_cache[cache_key] = merged_listing
+            # Save merged listing immediately to scraped_data.csv
+            try:
+                await self.csv_storage.save_single_listing(merged_listing)
+                logger.info(f"✓ Updated listing {listing_url} with deep search data in {Config.LISTINGS_CSV_FILENAME}")
+            except Exception as e:
+                logger.error(f"Error saving listing {listing_url}: {e}", exc_info=True)
+        else:
+            # Listing not found in scraped_data.csv
+            logger.warning(f"Listing {listing_url} not found in {Config.LISTINGS_CSV_FILENAME} (cache has {len(self._listings_cache)} entries), skipping (deep search only updates existing listings)")
+            # Log first few URLs in cache for debugging
+            sample_urls = list(self._listings_cache.keys())[:3]
+            logger.debug(f"Sample URLs in cache: {sample_urls}")
+            # Also log the listing URL for comparison
+            logger.debug(f"Looking for URL: {listing_url}")
+    
     def _update_stats_from_result(self, result: Optional[Dict], url: str) -> None:
         """Update statistics based on result"""
         if result is None:
@@ -232,8 +267,7 @@ class PipelineOrchestrator:
             return
         
         if "error" in result:
-            error_str = str(result.get("error", ""))
-            if "403" in error_str or "429" in error_str:
+            if self.url_processor.is_blocked_error(result):
                 self.stats["blocked"] += 1
             else:
                 self.stats["failed"] += 1
@@ -255,42 +289,102 @@ class PipelineOrchestrator:
         Returns:
             List[Dict]: List with all scraping results
         """
+        # Scrape each URL once, keeping the order of first appearance
+        unique_urls = list(dict.fromkeys(self.urls))
+        if len(unique_urls) < len(self.urls):
+            logger.info(f"Skipping {len(self.urls) - len(unique_urls)} duplicate URL(s)")
+            self.urls = unique_urls
+        
         logger.info(f"Starting pipeline: {len(self.urls)} URLs, max_concurrent={self.max_concurrent}, deep_search_only={self.deep_search_only}")
         self.stats["total"] = len(self.urls)
         
-        # In deep-only mode, use a single browser instance for all URLs
-        if self.deep_search_only:
-            results = await self._process_urls_with_single_browser()
-        else:
-            # Normal mode: use semaphore for concurrency control
-            results = await self._process_urls_with_concurrency()
+        try:
+            # Drop URLs that fail compliance before they take a worker and a browser
+            compliant_urls = await self.url_processor.filter_compliant(self.urls)
+            if len(compliant_urls) < len(self.urls):
+                logger.info(f"Skipping {len(self.urls) - len(compliant_urls)} URL(s) that failed compliance checks")
+                self.stats["skipped"] += len(self.urls) - len(compliant_urls)
+                self.urls = compliant_urls
+            
+            # In deep-only mode, every URL is an individual listing
+            if self.deep_search_only:
+                results = await self._process_listing_urls()
+            else:
+                # Normal mode: use semaphore for concurrency control
+                results = await self._process_urls_with_concurrency()
+        finally:
+            # Let queued image downloads finish (they journal their local paths) before
+            # folding any journaled deep search updates into the CSV
+            await self._finish_image_downloads()
+            await self.csv_storage.compact()
+            self.csv_storage.close()
+            await self.image_downloader.close()
+            
+            # Release the shared per-proxy HTTP sessions
+            if self.url_processor.proxy_manager:
+                await self.url_processor.proxy_manager.close()
         
         return results
     
-    async def _process_urls_with_single_browser(self) -> List[Dict]:
+    async def _run_url_workers(self, process: Callable[[int, str], Awaitable[Any]]) -> List[Any]:
         """
-        Process all listing URLs in deep-only mode using a single browser instance.
-        Sequential flow: process one URL, save immediately, move to next.
+        Run process(index, url) for every URL, at most max_concurrent at a time
+        
+        Only max_concurrent worker tasks are created; each one takes the next URL as
+        soon as it finishes the previous one, instead of a task per URL up front.
+        
+        Args:
+            process: Coroutine function called with the URL's index and the URL
+            
+        Returns:
+            Results in URL order; an exception raised by process takes the place of its result
+        """
+        results: List[Any] = [None] * len(self.urls)
+        pending_urls = iter(enumerate(self.urls))
+        
+        async def worker() -> None:
+            # Workers share the iterator, so every URL is taken by exactly one of them
+            for i, url in pending_urls:
+                try:
+                    results[i] = await process(i, url)
+                except Exception as e:
+                    results[i] = e
+        
+        async with asyncio.TaskGroup() as task_group:
+            for _ in range(min(max(1, self.max_concurrent), len(self.urls))):
+                task_group.create_task(worker())
+        
+        return results
+    
+    async def _process_listing_urls(self) -> List[Dict]:
+        """
+        Process all listing URLs in deep-only mode using a pool of warm browsers.
+        Up to max_concurrent listings are processed at once, each on its own browser
+        (and so its own proxy), and saved as soon as they finish. A browser that gets
+        blocked is discarded by the pool and relaunched with a fresh proxy.
         
         Returns:
             List[Dict]: List with all scraping results
         """
         logger.info("=" * 80)
-        logger.info(f"Starting deep search processing: {len(self.urls)} listing URLs")
+        logger.info(f"Starting deep search processing: {len(self.urls)} listing URLs (max_concurrent={self.max_concurrent})")
         logger.info("=" * 80)
         
-        # Create a single browser instance
-        browser_manager = BrowserManager(
-            headless=Config.HEADLESS,
-            proxy_manager=self.url_processor.proxy_manager
+        pool = BrowserPool(
+            pool_size=self.max_concurrent,
+            proxy_manager=self.url_processor.proxy_manager,
+            headless=Config.HEADLESS
         )
         
         results = []
         
         try:
-            # Initialize browser once
+            # Launch the first browser up front, so a broken browser setup stops the run
+            # before any listing is attempted
             try:
+                browser_manager = await pool.acquire()
                 await browser_manager.initialize()
+                await pool.release(browser_manager)
                 logger.info("✓ Browser initialized - ready to process listings")
             except Exception as browser_error:
                 error_msg = str(browser_error)
@@ -302,36 +396,42 @@ class PipelineOrchestrator:
                 logger.error("  3. Browser dependencies are installed")
                 raise  # Re-raise to stop processing
             
-            # Process all URLs sequentially
-            for i, url in enumerate(self.urls, 1):
-                logger.info("")
-                logger.info(f"[{i}/{len(self.urls)}] Processing listing: {url}")
+            total_urls = len(self.urls)
+            
+            async def process_listing(i: int, url: str) -> Optional[Dict]:
+                """Process a listing URL on a browser borrowed from the pool"""
+                logger.info(f"[{i + 1}/{total_urls}] Processing listing: {url}")
                 
+                browser_manager = await pool.acquire()
                 try:
-                    # Process URL with shared browser
                     result = await self.url_processor.process_url(
                         url,
                         browser_manager=browser_manager,
-                        reuse_browser=True
+                        reuse_browser=True,
+                        prechecked=True
                     )
-                    
-                    if result:
-                        self._update_stats_from_result(result, url)
-                        results.append(result)
-                    else:
-                        self.stats["skipped"] += 1
-                        
                 except Exception as e:
+                    # Browser state is unknown after a crash, don't hand it to the next listing
+                    await pool.release(browser_manager, discard=True)
                     logger.error(f"  ✗ Error processing listing {url}: {e}", exc_info=True)
                     self.stats["failed"] += 1
-                    results.append({"url": url, "error": str(e)})
+                    return {"url": url, "error": str(e)}
+                await pool.release(browser_manager)
+                
+                if result:
+                    self._update_stats_from_result(result, url)
+                    return result
+                
+                self.stats["skipped"] += 1
+                return None
+            
+            results = await self._run_url_workers(process_listing)
         
         finally:
-            # Close the single browser instance
             logger.info("")
-            logger.info("Closing browser...")
-            await browser_manager.close()
-            logger.info("✓ Browser closed")
+            logger.info("Closing browsers...")
+            await pool.close()
+            logger.info("✓ Browsers closed")
         
         # Filter out exceptions
         filtered_results = [r for r in results if r is not None and not isinstance(r, Exception)]
@@ -348,34 +448,49 @@ class PipelineOrchestrator:
     
     async def _process_urls_with_concurrency(self) -> List[Dict]:
         """
-        Process URLs with concurrency control using semaphore
+        Process URLs with concurrency control using a pool of warm browsers
+        
+        At most max_concurrent browsers are launched and each one is reused
+        for many URLs instead of starting a new browser per URL.
         
         Returns:
             List[Dict]: List with all scraping results
         """
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        pool = BrowserPool(
+            pool_size=self.max_concurrent,
+            proxy_manager=self.url_processor.proxy_manager,
+            headless=Config.HEADLESS
+        )
         
-        async def process_with_semaphore(url: str) -> Optional[Dict]:
-            """Process URL with semaphore for concurrency control"""
-            async with semaphore:
-                return await self.url_processor.process_url(url)
+        async def process_with_pooled_browser(i: int, url: str) -> Optional[Dict]:
+            """Process URL on a browser borrowed from the pool and record its outcome"""
+            browser_manager = await pool.acquire()
+            try:
+                result = await self.url_processor.process_url(
+                    url,
+                    browser_manager=browser_manager,
+                    reuse_browser=True,
+                    prechecked=True
+                )
+            except Exception as e:
+                # Browser state is unknown after a crash, don't hand it to the next URL
+                await pool.release(browser_manager, discard=True)
+                logger.error(f"Exception processing URL {url}: {e}", exc_info=True)
+                self.stats["failed"] += 1
+                return {"url": url, "error": str(e)}
+            await pool.release(browser_manager)
+            
+            # Stats are updated as each URL finishes, so they reflect progress during the run
+            self._update_stats_from_result(result, url)
+            return result
         
         # Process URLs with concurrency control
-        tasks = [process_with_semaphore(url) for url in self.urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out exceptions and None results, update stats
-        filtered_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Exception processing URL {self.urls[i]}: {result}", exc_info=True)
-                self.stats["failed"] += 1
-                filtered_results.append({"url": self.urls[i], "error": str(result)})
-            elif result is not None:
-                self._update_stats_from_result(result, self.urls[i])
-                filtered_results.append(result)
-            else:
-                self.stats["skipped"] += 1
+        try:
+            results = await self._run_url_workers(process_with_pooled_browser)
+        finally:
+            await pool.close()
+        
+        filtered_results = [result for result in results if result is not None]
         
         logger.info(f"Pipeline completed: {self.stats['success']} success, {self.stats['failed']} failed, {self.stats['blocked']} blocked, {self.stats['skipped']} skipped")
         
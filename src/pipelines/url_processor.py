@@ -4,17 +4,32 @@ Manages scraping attempts, error handling, and compliance checking
 """
 import asyncio
 import logging
-from typing import Dict, Optional, Callable, Awaitable
+import random
+import re
+import time
+from typing import Dict, List, Optional, Callable, Awaitable
+from urllib.parse import urlparse
 
 from src.core.browser_manager import BrowserManager
 from src.core.compliance_manager import ComplianceManager
 from src.core.human_behavior import HumanBehavior
 from src.core.proxy_manager import ProxyManager
-from src.services.zap_imoveis_service import ZapImoveisService
+from src.core.rate_limiter import RateLimiter
+from src.services.zap_imoveis_service import BLOCKED_STATUSES, ZapImoveisService
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Path fragments that mark a URL as a search results page
+_SEARCH_URL_INDICATORS = ('/venda/',)
+
+# User agent whose robots.txt rules are checked
+_ROBOTS_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# A blocking status as a whole number in the error text ("HTTP 429", "403 Forbidden"),
+# so longer numbers that merely contain one (ids, ports, byte counts) don't match
+_BLOCKED_STATUS_RE = re.compile(r'\b(?:%s)\b' % '|'.join(map(str, BLOCKED_STATUSES)))
+
 
 class URLProcessor:
     """Processes individual URLs with retry logic and error handling"""
@@ -48,11 +63,15 @@ class URLProcessor:
         self.save_callback = save_callback
         self.page_callback = page_callback
         self.deep_search_callback = deep_search_callback
+        
+        # host -> time.monotonic() before which no request is sent, from Retry-After headers
+        self._host_next_allowed: Dict[str, float] = {}
+        # host -> token bucket pacing page requests across all concurrent tasks
+        self._host_limiters: Dict[str, RateLimiter] = {}
     
     def is_search_url(self, url: str) -> bool:
         """Check if URL is a search results page"""
-        search_indicators = ['/venda/']
-        return any(indicator in url for indicator in search_indicators)
+        return any(indicator in url for indicator in _SEARCH_URL_INDICATORS)
     
     async def check_compliance(self, url: str) -> bool:
         """
@@ -68,18 +87,50 @@ class URLProcessor:
             logger.warning(f"Skipping potentially private data: {url}")
             return False
         
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        if not await self.compliance_manager.can_fetch(url, user_agent):
+        if not await self.compliance_manager.can_fetch(url, _ROBOTS_USER_AGENT):
             logger.warning(f"robots.txt disallows: {url}")
             return False
         
         await self.compliance_manager.wait_for_rate_limit(url)
         return True
     
+    async def filter_compliant(self, urls: List[str]) -> List[str]:
+        """
+        Drop URLs that fail the compliance checks, before any browser is assigned to them
+        
+        Hosts are checked concurrently and each host's URLs one after another, so
+        robots.txt is fetched once per host and the remaining checks hit the cache.
+        Per-request rate limiting still happens in process_url.
+        
+        Args:
+            urls: URLs to check
+            
+        Returns:
+            Compliant URLs, in their original order
+        """
+        urls_by_host: Dict[str, List[str]] = {}
+        for url in urls:
+            if not self.compliance_manager.is_public_data(url):
+                logger.warning(f"Skipping potentially private data: {url}")
+                continue
+            urls_by_host.setdefault(urlparse(url).netloc, []).append(url)
+        
+        async def check_host(host_urls: List[str]) -> List[str]:
+            allowed = []
+            for url in host_urls:
+                if await self.compliance_manager.can_fetch(url, _ROBOTS_USER_AGENT):
+                    allowed.append(url)
+                else:
+                    logger.warning(f"robots.txt disallows: {url}")
+            return allowed
+        
+        allowed_by_host = await asyncio.gather(*(check_host(host_urls) for host_urls in urls_by_host.values()))
+        allowed_urls = {url for host_urls in allowed_by_host for url in host_urls}
+        return [url for url in urls if url in allowed_urls]
+    
     def is_blocked_error(self, result: Dict) -> bool:
         """Check if result indicates a blocking error"""
-        error_str = str(result.get("error", ""))
-        return "403" in error_str or "429" in error_str
+        return _BLOCKED_STATUS_RE.search(str(result.get("error", ""))) is not None
     
     async def handle_blocked_error(
         self,
@@ -87,14 +138,51 @@ class URLProcessor:
         result: Dict,
         browser_manager: BrowserManager
     ) -> None:
-        """Handle blocked error by rotating proxy and fingerprint"""
+        """Handle blocked error by rotating proxy and fingerprint, honoring any requested wait"""
         logger.warning(f"Blocked on {url}: {result.get('error')}")
         await browser_manager.mark_proxy_failure()
         browser_manager.rotate_fingerprint()
+        browser_manager.needs_relaunch = True
+        
+        retry_after = result.get("retry_after")
+        if retry_after:
+            host = urlparse(url).netloc
+            next_allowed = time.monotonic() + retry_after
+            self._host_next_allowed[host] = max(self._host_next_allowed.get(host, 0.0), next_allowed)
+            logger.info(f"{host} asked to wait {retry_after:.1f}s before the next request")
+    
+    async def wait_for_host(self, url: str) -> None:
+        """
+        Wait until the URL's host may be requested again (Retry-After and request rate)
+        
+        Awaited by the service before every page navigation, so search pages and the
+        listings deep scraped from them all draw from the host's token bucket.
+        
+        Args:
+            url: URL about to be requested
+        """
+        host = urlparse(url).netloc
+        next_allowed = self._host_next_allowed.get(host)
+        if next_allowed is not None:
+            wait = next_allowed - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        
+        if Config.HOST_REQUESTS_PER_SECOND > 0:
+            limiter = self._host_limiters.get(host)
+            if limiter is None:
+                limiter = self._host_limiters[host] = RateLimiter(Config.HOST_REQUESTS_PER_SECOND)
+            await limiter.acquire()
     
     def calculate_retry_delay(self, attempt: int) -> float:
-        """Calculate retry delay with exponential backoff"""
-        return Config.RETRY_DELAY * (Config.RETRY_BACKOFF ** attempt)
+        """
+        Calculate retry delay with exponential backoff and jitter
+        
+        Half of the backoff is fixed and half is random ("equal jitter"), so tasks
+        blocked together don't all retry at the same moment.
+        """
+        backoff = Config.RETRY_DELAY * (Config.RETRY_BACKOFF ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
     
     async def attempt_scrape(
         self,
@@ -111,14 +199,14 @@ class URLProcessor:
         Returns:
             Scraping result or None
         """
-        # Only initialize if not already initialized (for single browser reuse)
+        # Only initialize if not already initialized (pooled browsers are reused across URLs)
         if browser_manager.context is None:
             await browser_manager.initialize()
         
         page = await browser_manager.create_page()
         
         try:
-            service = ZapImoveisService(page, self.human_behavior)
+            service = ZapImoveisService(page, self.human_behavior, before_navigation=self.wait_for_host)
             
             # If deep_search_only mode, treat all URLs as individual listings
             if self.deep_search_only:
@@ -232,7 +320,8 @@ class URLProcessor:
         self,
         url: str,
         browser_manager: Optional[BrowserManager] = None,
-        reuse_browser: bool = False
+        reuse_browser: bool = False,
+        prechecked: bool = False
     ) -> Optional[Dict]:
         """
         Process a single URL with retry logic and compliance checking
@@ -241,12 +330,16 @@ class URLProcessor:
             url: URL to be processed
             browser_manager: Optional pre-initialized BrowserManager (for reuse)
             reuse_browser: If True, reuse the provided browser_manager instead of creating new
+            prechecked: If True, the URL already passed filter_compliant and only the
+                rate limit is awaited
             
         Returns:
             Optional[Dict]: Extracted data or None in case of error
         """
-        # Check compliance
-        if not await self.check_compliance(url):
+        # Check compliance (URLs from filter_compliant only need the rate limit)
+        if prechecked:
+            await self.compliance_manager.wait_for_rate_limit(url)
+        elif not await self.check_compliance(url):
             return None
         
         max_retries = Config.MAX_RETRIES
@@ -3,6 +3,8 @@ Zap Imóveis Service - Where Playwright runs
 Focus: Zap Imóveis Data Extraction
 """
 from playwright.async_api import Page
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Callable, Awaitable
 import asyncio
 import logging
@@ -19,19 +21,69 @@ from src.services.zap_imoveis.selectors import SELECTOR_PROPERTY_CARD
 
 logger = logging.getLogger(__name__)
 
+# Statuses the site answers with when it blocks or rate limits us
+BLOCKED_STATUSES = (403, 429)
+# Longest server-requested wait honored before retrying (seconds)
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(headers: Dict[str, str]) -> Optional[float]:
+    """
+    Get how long the server asked us to wait from rate-limit response headers
+    
+    Args:
+        headers: Response headers (lower-case names, as Playwright reports them)
+        
+    Returns:
+        Seconds to wait (capped at MAX_RETRY_AFTER), or None if no usable header was sent
+    """
+    seconds = None
+    retry_after = (headers.get('retry-after') or '').strip()
+    reset = (headers.get('x-ratelimit-reset') or '').strip()
+    if retry_after:
+        # Either delta-seconds or an HTTP date
+        if retry_after.isdigit():
+            seconds = float(retry_after)
+        else:
+            try:
+                seconds = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+    elif reset:
+        try:
+            seconds = float(reset)
+        except ValueError:
+            pass
+        else:
+            # Large values are epoch timestamps, small ones are deltas
+            if seconds > 1e9:
+                seconds -= time.time()
+    
+    if seconds is None:
+        return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
 
 class ZapImoveisService:
     """Service responsible for extracting data from Zap Imóveis"""
     
-    def __init__(self, page: Page, human_behavior: Optional[HumanBehavior] = None):
+    def __init__(
+        self,
+        page: Page,
+        human_behavior: Optional[HumanBehavior] = None,
+        before_navigation: Optional[Callable[[str], Awaitable[None]]] = None
+    ):
         """
         Initializes the Zap Imóveis service
         
         Args:
             page: Playwright page to perform scraping
             human_behavior: HumanBehavior instance (creates new if None)
+            before_navigation: Optional coroutine function awaited with the URL before
+                every page navigation (used to pace requests per host)
         """
         self.page = page
+        self.before_navigation = before_navigation
         self.human_behavior = human_behavior or HumanBehavior(
             min_delay=Config.MIN_DELAY,
             max_delay=Config.MAX_DELAY,
@@ -44,6 +96,12 @@ class ZapImoveisService:
         self.pagination = PaginationHandler(page)
         self.search_extractor = SearchExtractor(page)
     
+    async def _goto(self, url: str, wait_until: str):
+        """Navigate the page to url, after awaiting the before_navigation hook"""
+        if self.before_navigation is not None:
+            await self.before_navigation(url)
+        return await self.page.goto(url, wait_until=wait_until, timeout=Config.NAVIGATION_TIMEOUT)
+    
     async def scrape_listing(self, url: str, deep_scrape: bool = True) -> Dict:
         """
         Extracts data from a specific Zap Imóveis listing
@@ -60,7 +118,17 @@ class ZapImoveisService:
             
             # Navigate with faster wait strategy - goto already waits, so skip redundant wait
             wait_strategy = Config.WAIT_UNTIL
-            await self.page.goto(url, wait_until=wait_strategy, timeout=Config.NAVIGATION_TIMEOUT)
+            response = await self._goto(url, wait_strategy)
+            
+            # Report blocks instead of extracting from the block page, passing on how long
+            # the server asked us to back off
+            if response is not None and response.status in BLOCKED_STATUSES:
+                logger.warning(f"HTTP {response.status} for listing {url}")
+                return {
+                    "url": url,
+                    "error": f"HTTP {response.status}",
+                    "retry_after": parse_retry_after(response.headers)
+                }
             
             # Skip redundant wait - goto already waited for the load state
             # Just a tiny delay for any dynamic content
@@ -119,7 +187,7 @@ class ZapImoveisService:
     async def _initialize_search_page(self, search_url: str) -> None:
         """Navigate to search page - goto already waits, skip redundant wait"""
         wait_strategy = Config.WAIT_UNTIL
-        await self.page.goto(search_url, wait_until=wait_strategy, timeout=Config.NAVIGATION_TIMEOUT)
+        await self._goto(search_url, wait_strategy)
         # Skip redundant wait - just tiny delay for dynamic content
         await asyncio.sleep(0.05)
     
@@ -188,7 +256,7 @@ class ZapImoveisService:
                 "Referer": "https://www.google.com/" if "page=" not in page_url else "https://www.zapimoveis.com.br/venda/"
             })
             
-            await self.page.goto(page_url, wait_until=wait_strategy, timeout=Config.NAVIGATION_TIMEOUT)
+            await self._goto(page_url, wait_strategy)
             
             # Debug: Check page title and URL to see what loaded
             page_title = await self.page.title()
@@ -319,10 +387,15 @@ class ZapImoveisService:
                 deep_scraped_listings.append(listing)
                 continue
             
+            retry_after = 0.0
             try:
                 logger.info(f"Deep scraping listing {i}/{len(listings)}: {listing_url}")
                 # Visit the listing page and perform deep scraping
                 deep_data = await self.scrape_listing(listing_url, deep_scrape=True)
+                if "error" in deep_data:
+                    # Keep the basic data rather than merging error fields into the listing
+                    retry_after = deep_data.get("retry_after") or 0.0
+                    raise RuntimeError(deep_data["error"])
                 # Log images found
                 if deep_data.get("images"):
                     logger.info(f"Found {len(deep_data['images'])} images in deep_data for {listing_url}")
@@ -362,9 +435,10 @@ class ZapImoveisService:
                     except Exception as e2:
                         logger.warning(f"Error saving listing {listing_url}: {e2}")
                 
-                # Still delay even on error to maintain rate
+                # Still delay even on error to maintain rate, at least as long as a
+                # rate-limited response asked for
                 if i < len(listings):
-                    delay = random.uniform(3.0, 5.0)
+                    delay = max(random.uniform(3.0, 5.0), retry_after)
                     await asyncio.sleep(delay)
         
         logger.info(f"Deep scraping completed for {len(deep_scraped_listings)} listings")
@@ -5,7 +5,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, Mock
 import os
 
-from src.core.browser_manager import BrowserManager, is_docker_environment
+from src.core.browser_manager import BrowserManager, is_docker_environment, _detect_runtime_headless
 from src.core.proxy_manager import ProxyManager, Proxy, ProxyType
 from src.core.fingerprint_manager import FingerprintManager, BrowserFingerprint
 from src.config import Config
@@ -30,6 +30,22 @@ class TestDockerEnvironment:
         with patch('os.path.exists', return_value=False):
             with patch.dict(os.environ, {}, clear=True):
                 assert is_docker_environment() is False
+    
+    def test_runtime_headless_probe_is_cached(self):
+        """Test Xvfb probing runs once and is shared by all BrowserManager instances"""
+        _detect_runtime_headless.cache_clear()
+        try:
+            with patch('src.core.browser_manager.is_docker_environment', return_value=True), \
+                 patch.dict(os.environ, {'DISPLAY': ':99'}), \
+                 patch('src.core.browser_manager.subprocess.run', return_value=Mock(returncode=0)) as mock_run:
+                first = BrowserManager(headless=True)
+                second = BrowserManager(headless=True)
+            
+            assert first.headless is False
+            assert second.headless is False
+            assert mock_run.call_count == 1
+        finally:
+            _detect_runtime_headless.cache_clear()
 
 
 @pytest.mark.asyncio
@@ -125,6 +141,29 @@ class TestBrowserManagerInitialization:
         assert context == mock_context
         mock_pw.chromium.launch.assert_called_once()
     
+    @patch('src.core.browser_manager.async_playwright')
+    @patch('src.core.browser_manager.Config')
+    async def test_initialize_chromium_args_deduplicated(self, mock_config, mock_playwright):
+        """Test that Chromium launch args have no duplicates and a single --disable-features"""
+        mock_config.HEADLESS = True
+        mock_config.BROWSER_TYPE = "chromium"
+        mock_config.FINGERPRINT_REGION = "US"
+        mock_config.PROXY_ENABLED = False
+        
+        mock_pw = AsyncMock()
+        mock_browser = AsyncMock()
+        mock_pw.chromium.launch = AsyncMock(return_value=mock_browser)
+        mock_browser.new_context = AsyncMock(return_value=AsyncMock())
+        mock_playwright.return_value.start = AsyncMock(return_value=mock_pw)
+        
+        manager = BrowserManager()
+        await manager.initialize()
+        
+        args = mock_pw.chromium.launch.call_args.kwargs["args"]
+        assert len(args) == len(set(args))
+        assert len([arg for arg in args if arg.startswith("--disable-features=")]) == 1
+        assert "--headless=new" in args
+    
     @patch('src.core.browser_manager.async_playwright')
     @patch('src.core.browser_manager.Config')
     async def test_initialize_generates_fingerprint(self, mock_config, mock_playwright):
@@ -188,6 +227,7 @@ class TestBrowserManagerPageCreation:
         mock_config.BROWSER_TYPE = "chromium"
         mock_config.FINGERPRINT_REGION = "US"
         mock_config.PROXY_ENABLED = False
+        mock_config.CONTEXT_ROTATE_AFTER_PAGES = 0
         
         mock_pw = AsyncMock()
         mock_browser = AsyncMock()
@@ -212,6 +252,7 @@ class TestBrowserManagerPageCreation:
         mock_config.BROWSER_TYPE = "chromium"
         mock_config.FINGERPRINT_REGION = "US"
         mock_config.PROXY_ENABLED = False
+        mock_config.CONTEXT_ROTATE_AFTER_PAGES = 0
         
         mock_pw = AsyncMock()
         mock_browser = AsyncMock()
@@ -229,6 +270,70 @@ class TestBrowserManagerPageCreation:
         assert page == mock_page
         # Should only call new_context once (during initialize)
         assert mock_browser.new_context.call_count == 1
+    
+    @patch('src.core.browser_manager.async_playwright')
+    @patch('src.core.browser_manager.Config')
+    async def test_create_page_recycles_context_after_limit(self, mock_config, mock_playwright):
+        """Test that the context is recreated with a new fingerprint after N pages"""
+        mock_config.HEADLESS = True
+        mock_config.BROWSER_TYPE = "chromium"
+        mock_config.FINGERPRINT_REGION = "US"
+        mock_config.PROXY_ENABLED = False
+        mock_config.FINGERPRINT_ROTATION = True
+        mock_config.CONTEXT_ROTATE_AFTER_PAGES = 2
+        
+        mock_pw = AsyncMock()
+        mock_browser = AsyncMock()
+        first_context = AsyncMock()
+        second_context = AsyncMock()
+        first_context.pages = []
+        second_context.pages = []
+        mock_pw.chromium.launch = AsyncMock(return_value=mock_browser)
+        mock_browser.new_context = AsyncMock(side_effect=[first_context, second_context])
+        mock_playwright.return_value.start = AsyncMock(return_value=mock_pw)
+        
+        manager = BrowserManager()
+        await manager.initialize()
+        old_fingerprint = manager.current_fingerprint
+        
+        await manager.create_page()
+        await manager.create_page()
+        assert manager.context is first_context
+        
+        await manager.create_page()
+        
+        first_context.close.assert_called_once()
+        mock_browser.close.assert_not_called()
+        assert manager.context is second_context
+        assert manager.current_fingerprint is not old_fingerprint
+        second_context.new_page.assert_called_once()
+    
+    @patch('src.core.browser_manager.async_playwright')
+    @patch('src.core.browser_manager.Config')
+    async def test_create_page_keeps_context_with_open_pages(self, mock_config, mock_playwright):
+        """Test that the context is not recycled while pages are still open"""
+        mock_config.HEADLESS = True
+        mock_config.BROWSER_TYPE = "chromium"
+        mock_config.FINGERPRINT_REGION = "US"
+        mock_config.PROXY_ENABLED = False
+        mock_config.FINGERPRINT_ROTATION = True
+        mock_config.CONTEXT_ROTATE_AFTER_PAGES = 1
+        
+        mock_pw = AsyncMock()
+        mock_browser = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.pages = [AsyncMock()]
+        mock_pw.chromium.launch = AsyncMock(return_value=mock_browser)
+        mock_browser.new_context = AsyncMock(return_value=mock_context)
+        mock_playwright.return_value.start = AsyncMock(return_value=mock_pw)
+        
+        manager = BrowserManager()
+        await manager.initialize()
+        await manager.create_page()
+        await manager.create_page()
+        
+        mock_context.close.assert_not_called()
+        assert mock_browser.new_context.call_count == 1
 
 
 @pytest.mark.asyncio
@@ -402,3 +507,19 @@ class TestBrowserManagerAntiBot:
         # Check that add_init_script was called (for anti-bot measures)
         assert mock_context.add_init_script.call_count >= 1
 
+    
+    async def test_configure_anti_bot_single_combined_script(self):
+        """Test that fingerprint and stealth scripts are injected in one cached call"""
+        manager = BrowserManager()
+        manager.current_fingerprint = manager.fingerprint_manager.generate_fingerprint()
+        mock_context = AsyncMock()
+        
+        await manager.configure_anti_bot(mock_context)
+        await manager.configure_anti_bot(mock_context)
+        
+        assert mock_context.add_init_script.call_count == 2
+        first_script = mock_context.add_init_script.call_args_list[0][0][0]
+        second_script = mock_context.add_init_script.call_args_list[1][0][0]
+        assert first_script is second_script
+        assert manager.current_fingerprint.user_agent in first_script
+        assert "navigator.__proto__.webdriver" in first_script
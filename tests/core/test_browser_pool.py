@@ -0,0 +1,74 @@
+"""
+Tests for BrowserPool - browser reuse and lifecycle
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.core.browser_pool import BrowserPool
+
+
+@pytest.mark.asyncio
+class TestBrowserPool:
+    """Tests for BrowserPool acquire/release"""
+    
+    async def test_acquire_reuses_released_browser(self):
+        """Test that a released browser is handed out again instead of a new one"""
+        pool = BrowserPool(pool_size=2)
+        
+        first = await pool.acquire()
+        await pool.release(first)
+        second = await pool.acquire()
+        
+        assert second is first
+        assert len(pool._managers) == 1
+    
+    async def test_acquire_grows_up_to_pool_size(self):
+        """Test that the pool creates at most pool_size browsers"""
+        pool = BrowserPool(pool_size=2)
+        
+        first = await pool.acquire()
+        second = await pool.acquire()
+        
+        assert first is not second
+        assert len(pool._managers) == 2
+        
+        await pool.release(first)
+        third = await pool.acquire()
+        assert third is first
+        assert len(pool._managers) == 2
+    
+    async def test_release_discard_closes_browser(self):
+        """Test that discarded browsers are closed and free their slot"""
+        pool = BrowserPool(pool_size=1)
+        browser_manager = await pool.acquire()
+        
+        with patch.object(browser_manager, 'close', new_callable=AsyncMock) as mock_close:
+            await pool.release(browser_manager, discard=True)
+        
+        mock_close.assert_called_once()
+        assert pool._managers == []
+        assert await pool.acquire() is not browser_manager
+    
+    async def test_release_discards_blocked_browser(self):
+        """Test that a browser flagged for relaunch after a block is not reused"""
+        pool = BrowserPool(pool_size=1)
+        browser_manager = await pool.acquire()
+        browser_manager.needs_relaunch = True
+        
+        with patch.object(browser_manager, 'close', new_callable=AsyncMock) as mock_close:
+            await pool.release(browser_manager)
+        
+        mock_close.assert_called_once()
+        assert await pool.acquire() is not browser_manager
+    
+    async def test_close_closes_all_browsers(self):
+        """Test that closing the pool closes every created browser"""
+        async with BrowserPool(pool_size=2) as pool:
+            first = await pool.acquire()
+            second = await pool.acquire()
+            first.close = AsyncMock()
+            second.close = AsyncMock()
+        
+        first.close.assert_called_once()
+        second.close.assert_called_once()
+        assert pool._managers == []
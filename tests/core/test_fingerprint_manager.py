@@ -231,6 +231,25 @@ class TestFingerprintManagerAntiDetectScript:
         script = manager.get_anti_detect_script(fingerprint)
         
         assert "deviceMemory" not in script or "undefined" in script
+    
+    @patch('src.core.fingerprint_manager.UserAgent')
+    def test_get_anti_detect_script_cached_per_fingerprint(self, mock_ua_class):
+        """Test that scripts are reused for equal fingerprints and rebuilt when values change"""
+        mock_ua = Mock()
+        mock_ua.random = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        mock_ua_class.return_value = mock_ua
+        
+        manager = FingerprintManager()
+        fingerprint = manager.generate_fingerprint()
+        
+        first = manager.get_anti_detect_script(fingerprint)
+        second = manager.get_anti_detect_script(fingerprint)
+        assert second is first
+        
+        fingerprint.hardware_concurrency = 64
+        third = manager.get_anti_detect_script(fingerprint)
+        assert third is not first
+        assert "64" in third
 
 
 @pytest.mark.asyncio
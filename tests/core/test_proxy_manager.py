@@ -336,3 +336,31 @@ class TestProxyManagerStats:
         assert "residential" in stats["by_type"]
         assert "datacenter" in stats["by_type"]
 
+
+
+@pytest.mark.asyncio
+class TestProxyManagerSessions:
+    """Tests for shared per-proxy HTTP sessions"""
+    
+    async def test_get_session_reused_per_proxy(self):
+        """Test that each proxy gets one long-lived session"""
+        manager = ProxyManager()
+        proxy1 = manager.add_proxy("127.0.0.1", 8080, username="user", password="pass")
+        proxy2 = manager.add_proxy("127.0.0.1", 8081)
+        
+        session1 = manager.get_session(proxy1)
+        try:
+            assert manager.get_session(proxy1) is session1
+            assert manager.get_session(proxy2) is not session1
+        finally:
+            await manager.close()
+        
+        assert session1.closed
+        assert manager._sessions == {}
+    
+    async def test_get_session_socks5_unsupported(self):
+        """Test that socks5 proxies have no aiohttp session"""
+        manager = ProxyManager()
+        proxy = manager.add_proxy("127.0.0.1", 1080, protocol="socks5")
+        
+        assert manager.get_session(proxy) is None
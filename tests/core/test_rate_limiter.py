@@ -0,0 +1,34 @@
+"""
+Tests for RateLimiter - token bucket pacing
+"""
+import asyncio
+import pytest
+
+from src.core.rate_limiter import RateLimiter
+
+
+@pytest.mark.asyncio
+class TestRateLimiter:
+    """Tests for RateLimiter acquire"""
+    
+    async def test_allows_burst_then_waits(self):
+        """Test that the rate limiter lets a full bucket through, then paces requests"""
+        limiter = RateLimiter(20)
+        loop = asyncio.get_running_loop()
+        
+        start = loop.time()
+        for _ in range(20):
+            await limiter.acquire()
+        assert loop.time() - start < 0.04
+        
+        await limiter.acquire()
+        assert loop.time() - start >= 0.04
+    
+    async def test_fractional_rate_allows_one_request(self):
+        """Test that rates below one request per second still let the first request through"""
+        limiter = RateLimiter(0.5)
+        loop = asyncio.get_running_loop()
+        
+        start = loop.time()
+        await limiter.acquire()
+        assert loop.time() - start < 0.01
@@ -3,13 +3,14 @@ Tests for CSVStorageManager - CSV operations, file locking, data merging
 """
 import pytest
 import csv
+import gzip
 import asyncio
 from pathlib import Path
 import tempfile
 import shutil
 from unittest.mock import patch
 
-from src.pipelines.csv_storage import CSVStorageManager
+from src.pipelines.csv_storage import CSVStorageManager, fcntl
 
 
 @pytest.fixture
@@ -90,6 +91,15 @@ class TestCSVStorageManagerDataConversion:
         assert isinstance(row["metadata"], str)  # Dict converted to string
         assert "column_42" not in row  # Invalid fieldname filtered
     
+    def test_is_empty_value(self, temp_output_dir):
+        """Test empty value detection used when merging"""
+        storage = CSVStorageManager(temp_output_dir)
+        
+        for value in [None, "", "   ", " None ", "NULL", "false", []]:
+            assert storage._is_empty_value(value) is True
+        for value in ["0", "nonempty", "falsey", [1], 0, False]:
+            assert storage._is_empty_value(value) is False
+    
     def test_get_all_fieldnames(self, temp_output_dir):
         """Test extracting all fieldnames from listings"""
         storage = CSVStorageManager(temp_output_dir)
@@ -202,6 +212,41 @@ class TestCSVStorageManagerSaveOperations:
             rows = list(reader)
             assert len(rows) == 2
     
+    @pytest.mark.asyncio
+    async def test_save_page_listings_async_waits_for_write_lock(self, temp_output_dir):
+        """Test that async page saves wait for the CSV write lock (e.g. a running compaction)"""
+        storage = CSVStorageManager(temp_output_dir)
+        listings = [{"url": "https://example.com/1", "price": 100000}]
+        
+        async with storage._locked():
+            task = asyncio.create_task(storage.save_page_listings_async(1, listings))
+            await asyncio.sleep(0.05)
+            assert not storage.filepath.exists()
+        
+        await task
+        storage.close()
+        
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == ["https://example.com/1"]
+    
+    @pytest.mark.asyncio
+    async def test_full_rewrites_async_wait_for_write_lock(self, temp_output_dir):
+        """Test that full rewrites from coroutines wait for the CSV write lock and keep journaled saves"""
+        storage = CSVStorageManager(temp_output_dir, journal_max_bytes=1 << 20)
+        
+        async with storage._locked():
+            task = asyncio.create_task(storage.save_results_async([{"url": "https://example.com/1", "price": 1}]))
+            await asyncio.sleep(0.05)
+            assert not storage.filepath.exists()
+        await task
+        await storage.save_single_listing({"url": "https://example.com/2", "price": 2})
+        await storage.save_listings_batch_async([{"url": "https://example.com/3", "price": 3}])
+        storage.close()
+        
+        data, _ = storage._read_existing_data()
+        assert list(data) == ["https://example.com/1", "https://example.com/2", "https://example.com/3"]
+    
     def test_save_listings_batch(self, temp_output_dir):
         """Test saving batch of listings"""
         storage = CSVStorageManager(temp_output_dir)
@@ -220,6 +265,24 @@ class TestCSVStorageManagerSaveOperations:
             rows = list(reader)
             assert len(rows) == 2
     
+    def test_save_listings_batch_appends_new_listings(self, temp_output_dir):
+        """Test that a batch of new URLs with existing columns is appended instead of rewriting the file"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_listings_batch([{"url": "https://example.com/b", "price": 2}])
+        
+        with patch.object(storage, '_write_listings') as mock_write:
+            storage.save_listings_batch([
+                {"url": "https://example.com/a", "price": 1},
+                {"url": "https://example.com/c", "price": 3}
+            ])
+        
+        mock_write.assert_not_called()
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == [
+            "https://example.com/b", "https://example.com/a", "https://example.com/c"
+        ]
+    
     def test_save_results(self, temp_output_dir):
         """Test saving results with search results flattening"""
         storage = CSVStorageManager(temp_output_dir)
@@ -243,6 +306,205 @@ class TestCSVStorageManagerSaveOperations:
             reader = csv.DictReader(f)
             rows = list(reader)
             assert len(rows) == 3  # 2 from search_results + 1 direct
+    
+    @pytest.mark.asyncio
+    async def test_export_gzip(self, temp_output_dir):
+        """Test that export_gzip writes a compressed copy and leaves the CSV plain text"""
+        storage = CSVStorageManager(temp_output_dir)
+        assert await storage.export_gzip() is None
+        
+        storage.save_results([
+            {"url": "https://example.com/1", "price": 100000},
+            {"url": "https://example.com/2", "price": 200000}
+        ])
+        export_path = await storage.export_gzip()
+        storage.close()
+        
+        assert export_path == temp_output_dir / "scraped_data.csv.gz"
+        with gzip.open(export_path, 'rb') as f:
+            assert f.read() == storage.filepath.read_bytes()
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == ["https://example.com/1", "https://example.com/2"]
+        assert not export_path.with_name(export_path.name + '.tmp').exists()
+
+
+class TestCSVStorageManagerJournal:
+    """Tests for the append-only journal of single-listing saves"""
+    
+    @pytest.mark.asyncio
+    async def test_save_single_listing_journals_until_threshold(self, temp_output_dir):
+        """Test that saves below the threshold only append to the journal"""
+        storage = CSVStorageManager(temp_output_dir, journal_max_bytes=1024 * 1024)
+        
+        await storage.save_single_listing({"url": "https://example.com/1", "price": 100})
+        await storage.save_single_listing({"url": "https://example.com/1", "title": "Updated"})
+        
+        assert not storage.filepath.exists()
+        assert storage.journal_path.exists()
+        
+        # Readers see journaled data merged in
+        data, _ = storage._read_existing_data()
+        assert data["https://example.com/1"]["price"] == 100
+        assert data["https://example.com/1"]["title"] == "Updated"
+    
+    @pytest.mark.asyncio
+    async def test_compact_writes_csv_and_clears_journal(self, temp_output_dir):
+        """Test that compact folds the journal into the CSV once"""
+        storage = CSVStorageManager(temp_output_dir, journal_max_bytes=1024 * 1024)
+        
+        for i in range(3):
+            await storage.save_single_listing({"url": f"https://example.com/{i}", "price": i})
+        await storage.compact()
+        
+        assert not storage.journal_path.exists()
+        assert list(temp_output_dir.glob("*.tmp")) == []
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == [f"https://example.com/{i}" for i in range(3)]
+    
+    @pytest.mark.asyncio
+    async def test_new_listing_with_known_columns_is_appended(self, temp_output_dir):
+        """Test that a new URL with existing columns is appended instead of rewriting the file"""
+        storage = CSVStorageManager(temp_output_dir)
+        await storage.save_single_listing({"url": "https://example.com/b", "price": 2})
+        
+        with patch.object(storage, '_write_listings') as mock_write:
+            await storage.save_single_listing({"url": "https://example.com/a", "price": 1})
+        
+        mock_write.assert_not_called()
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == ["https://example.com/b", "https://example.com/a"]
+        assert storage._read_existing_data() == CSVStorageManager(temp_output_dir)._read_existing_data()
+    
+    @pytest.mark.asyncio
+    async def test_new_column_forces_rewrite(self, temp_output_dir):
+        """Test that a listing adding a column rewrites the file with the new header"""
+        storage = CSVStorageManager(temp_output_dir)
+        await storage.save_single_listing({"url": "https://example.com/b", "price": 2})
+        await storage.save_single_listing({"url": "https://example.com/a", "area": 50})
+        
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == ["https://example.com/b", "https://example.com/a"]
+        assert rows[1]["area"] == "50"
+    
+    def test_apply_journal_skips_corrupt_lines(self, temp_output_dir):
+        """Test that a corrupt journal line does not stop replay"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.journal_path.write_text(
+            '{"url": "https://example.com/1", "price": 1}\n{broken\n',
+            encoding='utf-8'
+        )
+        
+        data = {}
+        assert storage._apply_journal(data) == 1
+        assert data["https://example.com/1"]["price"] == 1
+
+
+class TestCSVStorageManagerAtomicRewrite:
+    """Tests for rewrites going through a temp file and os.replace"""
+    
+    def test_failed_batch_rewrite_keeps_previous_file(self, temp_output_dir):
+        """Test that an error while writing leaves the existing CSV intact"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([{"url": "https://example.com/1", "price": 1}])
+        before = storage.filepath.read_bytes()
+        
+        with patch('src.pipelines.csv_storage.csv.writer', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                storage.save_listings_batch([{"url": "https://example.com/2", "price": 2, "area": 50}])
+        
+        assert storage.filepath.read_bytes() == before
+    
+    def test_rewrite_keeps_file_order(self, temp_output_dir):
+        """Test that updates keep rows in place and new rows are added at the end"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([
+            {"url": "https://example.com/b", "price": 2},
+            {"url": "https://example.com/a", "price": 1}
+        ])
+        storage.save_listings_batch([
+            {"url": "https://example.com/c", "price": 3},
+            {"url": "https://example.com/a", "price": 10}
+        ])
+        
+        with open(storage.filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == [
+            "https://example.com/b", "https://example.com/a", "https://example.com/c"
+        ]
+        assert rows[1]["price"] == "10"
+    
+    def test_rewrites_leave_no_temp_file(self, temp_output_dir):
+        """Test that successful rewrites replace the CSV and leave no temp file"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([{"url": "https://example.com/1", "price": 1}])
+        storage.save_listings_batch([{"url": "https://example.com/2", "price": 2}])
+        
+        assert not storage.tmp_path.exists()
+        data, _ = storage._read_existing_data()
+        assert set(data) == {"https://example.com/1", "https://example.com/2"}
+
+
+class TestCSVStorageManagerReadCache:
+    """Tests for the mtime-keyed cache of parsed CSV data"""
+    
+    def test_unchanged_file_is_parsed_once(self, temp_output_dir):
+        """Test that repeated reads of an unchanged file reuse the parse"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([{"url": "https://example.com/1", "price": 1}])
+        
+        with patch.object(storage, '_parse_csv_file', wraps=storage._parse_csv_file) as mock_parse:
+            first, _ = storage._read_existing_data()
+            first["https://example.com/1"]["price"] = "changed"
+            second, _ = storage._read_existing_data()
+        
+        assert mock_parse.call_count == 1
+        assert second["https://example.com/1"]["price"] == "1"
+    
+    def test_low_cardinality_values_are_shared(self, temp_output_dir):
+        """Test that repeated location values are one string object after parsing"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([
+            {"url": f"https://example.com/{i}", "location": "Copacabana, Rio de Janeiro"}
+            for i in range(3)
+        ])
+        
+        data, _ = storage._parse_csv_file()
+        
+        locations = [row["location"] for row in data.values()]
+        assert locations[0] == "Copacabana, Rio de Janeiro"
+        assert all(location is locations[0] for location in locations)
+    
+    def test_external_change_invalidates_cache(self, temp_output_dir):
+        """Test that rewriting the file on disk is picked up"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_results([{"url": "https://example.com/1", "price": 1}])
+        storage._read_existing_data()
+        
+        CSVStorageManager(temp_output_dir).save_results([
+            {"url": "https://example.com/1", "price": 1},
+            {"url": "https://example.com/2", "price": 2}
+        ])
+        data, _ = storage._read_existing_data()
+        
+        assert set(data) == {"https://example.com/1", "https://example.com/2"}
+    
+    def test_cache_after_write_matches_parsed_file(self, temp_output_dir):
+        """Test that the cache seeded by a write equals what parsing the file returns"""
+        storage = CSVStorageManager(temp_output_dir)
+        storage.save_listings_batch([
+            {"url": "https://example.com/1", "price": 1.5, "tags": ["a", "b"], "extra": {"k": "v"}},
+            {"url": "https://example.com/2", "title": "  padded  ", "area": None, "active": True}
+        ])
+        
+        with patch.object(storage, '_parse_csv_file') as mock_parse:
+            cached = storage._read_existing_data()
+        
+        mock_parse.assert_not_called()
+        assert cached == CSVStorageManager(temp_output_dir)._read_existing_data()
 
 
 class TestCSVStorageManagerFileLocking:
@@ -271,6 +533,51 @@ class TestCSVStorageManagerFileLocking:
             rows = list(reader)
             assert len(rows) == 5
     
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(fcntl is None, reason="flock is not available on this platform")
+    async def test_cancelled_lock_wait_releases_flock(self, temp_output_dir):
+        """Test that cancelling a task waiting on the flock does not leave it held"""
+        storage = CSVStorageManager(temp_output_dir)
+        lock_path = storage.filepath.with_suffix('.lock')
+        
+        # Another process holding the lock
+        with open(lock_path, 'a+b') as other:
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+            
+            async def hold_lock():
+                async with storage._locked():
+                    pass
+            
+            task = asyncio.create_task(hold_lock())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+            
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            
+            # Would raise BlockingIOError if the cancelled task still held the flock
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+        
+        storage.close()
+    
+    @pytest.mark.asyncio
+    async def test_lock_file_is_reused_across_saves(self, temp_output_dir):
+        """Test that the lock file is opened once and kept instead of recreated per save"""
+        storage = CSVStorageManager(temp_output_dir)
+        
+        await storage.save_single_listing({"url": "https://example.com/1", "price": 1})
+        fd = storage._lock_fds[storage.filepath.with_suffix('.lock')]
+        await storage.save_single_listing({"url": "https://example.com/2", "price": 2})
+        
+        assert storage._lock_fds[storage.filepath.with_suffix('.lock')] == fd
+        assert storage.filepath.with_suffix('.lock').exists()
+        
+        storage.close()
+        assert storage._lock_fds == {}
+    
     @pytest.mark.asyncio
     async def test_save_single_listing_empty_listing(self, temp_output_dir):
         """Test saving empty listing"""
@@ -322,6 +629,19 @@ class TestCSVStorageManagerFileLocking:
         assert isinstance(existing_data, dict)
         assert isinstance(fieldnames, list)
     
+    def test_read_existing_data_no_headers_finds_url_column(self, temp_output_dir):
+        """Test that the URL column is found even after a quoted field with commas"""
+        storage = CSVStorageManager(temp_output_dir)
+        url = "https://www.zapimoveis.com.br/imovel/venda-apartamento-id-1/"
+        
+        with open(storage.filepath, 'w', newline='', encoding='utf-8') as f:
+            f.write(f'100000,"Rua A, 10",{url}\n200000,"Rua B, 20",{url}2\n')
+        
+        existing_data, _ = storage._read_existing_data()
+        
+        assert set(existing_data) == {url, f"{url}2"}
+        assert existing_data[url]["column_2"] == url
+    
     def test_read_existing_data_with_url_in_fieldnames(self, temp_output_dir):
         """Test reading CSV where fieldnames look like URLs"""
         storage = CSVStorageManager(temp_output_dir)
@@ -335,6 +655,21 @@ class TestCSVStorageManagerFileLocking:
         # Should filter out URL-like fieldnames
         assert isinstance(existing_data, dict)
     
+    def test_read_existing_data_with_short_rows_and_blank_lines(self, temp_output_dir):
+        """Test that short rows are padded with None and blank lines are skipped"""
+        storage = CSVStorageManager(temp_output_dir)
+        
+        with open(storage.filepath, 'w', newline='', encoding='utf-8') as f:
+            f.write("url,price,title\n\nhttps://example.com/1, 100 \nhttps://example.com/2,200,Two\n")
+        
+        existing_data, fieldnames = storage._read_existing_data()
+        
+        assert fieldnames == ["url", "price", "title"]
+        assert existing_data["https://example.com/1"] == {
+            "url": "https://example.com/1", "price": "100", "title": None
+        }
+        assert existing_data["https://example.com/2"]["title"] == "Two"
+    
     def test_read_existing_data_with_rows_without_url(self, temp_output_dir):
         """Test reading CSV with rows that have URL in other fields"""
         storage = CSVStorageManager(temp_output_dir)
@@ -104,6 +104,17 @@ class TestDataPipelineCSVSaving:
             rows = list(reader)
             assert len(rows) == 2
     
+    async def test_save_to_csv_async(self, temp_output_dir):
+        """Test saving results to CSV from a coroutine"""
+        pipeline = DataPipeline(urls=[], output_dir=str(temp_output_dir))
+        pipeline.results = [{"url": "https://example.com/1", "price": 100000}]
+        
+        await pipeline.save_to_csv_async()
+        
+        with open(temp_output_dir / "scraped_data.csv", 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["url"] for row in rows] == ["https://example.com/1"]
+    
     def test_save_to_csv(self, temp_output_dir):
         """Test saving results to CSV"""
         pipeline = DataPipeline(urls=[], output_dir=str(temp_output_dir))
@@ -191,7 +202,7 @@ class TestDataPipelineRun:
     """Tests for run method - Public API"""
     
     @patch('src.pipelines.data_pipeline.DataPipeline.process_urls')
-    @patch('src.pipelines.data_pipeline.DataPipeline.save_to_csv')
+    @patch('src.pipelines.data_pipeline.DataPipeline.save_to_csv_async')
     async def test_run_completes_pipeline(self, mock_save_to_csv, mock_process_urls):
         """Test that run method completes full pipeline"""
         mock_process_urls.return_value = [{"url": "test"}]
@@ -201,3 +212,16 @@ class TestDataPipelineRun:
         
         mock_process_urls.assert_called_once()
         mock_save_to_csv.assert_called_once()
+    
+    @patch('src.pipelines.data_pipeline.DataPipeline.process_urls')
+    @patch('src.pipelines.data_pipeline.DataPipeline.save_to_csv_async')
+    async def test_run_exports_gzip_when_enabled(self, mock_save_to_csv, mock_process_urls):
+        """Test that run writes the gzip export after saving when CSV_GZIP_EXPORT is set"""
+        pipeline = DataPipeline(urls=["https://example.com"])
+        
+        with patch.object(Config, 'CSV_GZIP_EXPORT', True):
+            with patch.object(pipeline.csv_storage, 'export_gzip', new_callable=AsyncMock) as mock_export:
+                await pipeline.run()
+        
+        mock_save_to_csv.assert_called_once()
+        mock_export.assert_awaited_once()
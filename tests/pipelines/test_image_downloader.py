@@ -1,6 +1,7 @@
 """
 Tests for ImageDownloader - Image downloads, rate limiting, directory management
 """
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from pathlib import Path
@@ -109,11 +110,10 @@ class TestImageDownloaderDownload:
     @pytest.mark.asyncio
     @patch('src.pipelines.image_downloader.Config')
     @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
-    @patch('src.pipelines.image_downloader.aiofiles.open')
-    async def test_download_listing_images(self, mock_aiofiles, mock_session_class, mock_config, temp_output_dir):
+    async def test_download_listing_images(self, mock_session_class, mock_config, temp_output_dir):
         """Test downloading listing images"""
         mock_config.SAVE_IMAGES = True
-        mock_config.IMAGE_DOWNLOAD_DELAY = 0.0
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
         
         downloader = ImageDownloader(temp_output_dir)
         
@@ -122,13 +122,12 @@ class TestImageDownloaderDownload:
             "images": ["https://example.com/img1.jpg", "https://example.com/img2.jpg"]
         }
         
-        # Mock HTTP response
-        async def mock_iter_chunked(chunk_size):
-            yield b"image_data"
-        
+        # Mock HTTP response with a known size, so the body is read in one go
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.content.iter_chunked = mock_iter_chunked
+        mock_response.content_type = "image/jpeg"
+        mock_response.content_length = len(b"image_data")
+        mock_response.read = AsyncMock(return_value=b"image_data")
         
         # Create async context manager for response
         class MockResponseContext:
@@ -145,14 +144,6 @@ class TestImageDownloaderDownload:
         mock_session.get = Mock(return_value=MockResponseContext(mock_response))
         mock_session_class.return_value = mock_session
         
-        # Mock file writing
-        mock_file = AsyncMock()
-        mock_file.write = AsyncMock()
-        mock_file_context = AsyncMock()
-        mock_file_context.__aenter__ = AsyncMock(return_value=mock_file)
-        mock_file_context.__aexit__ = AsyncMock(return_value=None)
-        mock_aiofiles.return_value = mock_file_context
-        
         await downloader.download_listing_images(listing)
         
         # Should have attempted to download
@@ -160,12 +151,135 @@ class TestImageDownloaderDownload:
         assert "images_local" in listing
         assert "images_local_count" in listing
         assert listing["images_local_count"] == 2
+        for local_path in listing["images_local"]:
+            assert (temp_output_dir / local_path).read_bytes() == b"image_data"
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
+    async def test_download_listing_images_streams_unknown_size(self, mock_session_class, mock_config, temp_output_dir):
+        """Test that responses without a Content-Length are streamed to disk"""
+        mock_config.SAVE_IMAGES = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        downloader = ImageDownloader(temp_output_dir)
+        
+        listing = {
+            "url": "https://example.com/imovel/id-123456/",
+            "images": ["https://example.com/img1.jpg"]
+        }
+        
+        async def mock_iter_chunked(chunk_size):
+            yield b"image_"
+            yield b"data"
+        
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.content_type = "image/jpeg"
+        mock_response.content_length = None
+        mock_response.content.iter_chunked = mock_iter_chunked
+        
+        class MockResponseContext:
+            def __init__(self, response):
+                self.response = response
+            async def __aenter__(self):
+                return self.response
+            async def __aexit__(self, *args):
+                return None
+        
+        mock_session = Mock()
+        mock_session.get = Mock(return_value=MockResponseContext(mock_response))
+        mock_session_class.return_value = mock_session
+        
+        await downloader.download_listing_images(listing)
+        
+        assert listing["images_local_count"] == 1
+        assert (temp_output_dir / listing["images_local"][0]).read_bytes() == b"image_data"
+        mock_response.read.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
+    async def test_download_listing_images_uses_proxy_session(self, mock_session_class, mock_config, temp_output_dir):
+        """Test that downloads reuse the ProxyManager session instead of creating one"""
+        mock_config.SAVE_IMAGES = True
+        mock_config.PROXY_ENABLED = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        proxy_session = Mock()
+        proxy_manager = Mock()
+        proxy_manager.proxies = [Mock()]
+        proxy_manager.get_proxy = AsyncMock(return_value=proxy_manager.proxies[0])
+        proxy_manager.get_session = Mock(return_value=proxy_session)
+        
+        downloader = ImageDownloader(temp_output_dir, proxy_manager=proxy_manager)
+        listing = {
+            "url": "https://example.com/imovel/id-123456/",
+            "images": ["https://example.com/img1.jpg"]
+        }
+        
+        with patch.object(downloader, '_download_single_image', AsyncMock(return_value="images/listing_123456/image_001.jpg")) as mock_download:
+            await downloader.download_listing_images(listing)
+        
+        mock_session_class.assert_not_called()
+        proxy_manager.get_session.assert_called_once_with(proxy_manager.proxies[0])
+        assert mock_download.call_args[0][0] is proxy_session
+        assert listing["images_local_count"] == 1
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    async def test_direct_session_shared_across_listings(self, mock_config, temp_output_dir):
+        """Test that one direct session serves every listing until close()"""
+        mock_config.SAVE_IMAGES = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        downloader = ImageDownloader(temp_output_dir)
+        with patch.object(downloader, '_download_single_image', AsyncMock(return_value=None)) as mock_download:
+            for i in range(2):
+                await downloader.download_listing_images({
+                    "url": f"https://example.com/imovel/id-{i}/",
+                    "images": ["https://example.com/img.jpg"]
+                })
+        
+        sessions = {call.args[0] for call in mock_download.call_args_list}
+        assert len(sessions) == 1
+        session = sessions.pop()
+        
+        await downloader.close()
+        assert session.closed
+        assert downloader._session is None
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    async def test_download_images_concurrently_in_order(self, mock_config, temp_output_dir):
+        """Test that images download in parallel up to max_concurrent and keep their order"""
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        downloader = ImageDownloader(temp_output_dir, max_concurrent=3)
+        in_flight = 0
+        peak = 0
+        
+        async def fake_download(session, image_url, index, output_path, max_images):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * (10 - index))
+            in_flight -= 1
+            return None if index == 4 else f"images/x/image_{index + 1:03d}.jpg"
+        
+        images = [f"https://example.com/img{i}.jpg" for i in range(10)]
+        with patch.object(downloader, '_download_single_image', side_effect=fake_download):
+            paths = await downloader._download_images(Mock(), images, temp_output_dir, max_images=20)
+        
+        assert peak == 3
+        assert paths == [f"images/x/image_{i + 1:03d}.jpg" for i in range(10) if i != 4]
     
     @pytest.mark.asyncio
     @patch('src.pipelines.image_downloader.Config')
     async def test_download_listing_images_no_images(self, mock_config, temp_output_dir):
         """Test downloading when listing has no images"""
         mock_config.SAVE_IMAGES = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
         
         downloader = ImageDownloader(temp_output_dir)
         listing = {"url": "https://example.com/listing", "images": []}
@@ -181,7 +295,7 @@ class TestImageDownloaderDownload:
     async def test_download_listing_images_max_limit(self, mock_session_class, mock_config, temp_output_dir):
         """Test that download respects max_images limit"""
         mock_config.SAVE_IMAGES = True
-        mock_config.IMAGE_DOWNLOAD_DELAY = 0.0
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
         
         downloader = ImageDownloader(temp_output_dir)
         
@@ -193,7 +307,9 @@ class TestImageDownloaderDownload:
         # Mock HTTP response
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.content.iter_chunked = AsyncMock(return_value=iter([b"data"]))
+        mock_response.content_type = "image/jpeg"
+        mock_response.content_length = len(b"data")
+        mock_response.read = AsyncMock(return_value=b"data")
         
         class MockResponseContext:
             def __init__(self, response):
@@ -209,20 +325,11 @@ class TestImageDownloaderDownload:
         mock_session.get = Mock(return_value=MockResponseContext(mock_response))
         mock_session_class.return_value = mock_session
         
-        # Mock file writing
-        with patch('src.pipelines.image_downloader.aiofiles.open', new_callable=AsyncMock) as mock_aiofiles:
-            mock_file = AsyncMock()
-            mock_file.write = AsyncMock()
-            mock_file_context = AsyncMock()
-            mock_file_context.__aenter__ = AsyncMock(return_value=mock_file)
-            mock_file_context.__aexit__ = AsyncMock(return_value=None)
-            mock_aiofiles.return_value = mock_file_context
-            
-            await downloader.download_listing_images(listing, max_images=10)
-            
-            # Should only download 10 images
-            assert mock_session.get.call_count == 10
-            assert listing.get("images_local_count", 0) <= 10
+        await downloader.download_listing_images(listing, max_images=10)
+        
+        # Should only download 10 images
+        assert mock_session.get.call_count == 10
+        assert listing.get("images_local_count", 0) <= 10
     
     @pytest.mark.asyncio
     @patch('src.pipelines.image_downloader.Config')
@@ -230,7 +337,7 @@ class TestImageDownloaderDownload:
     async def test_download_listing_images_http_error(self, mock_session_class, mock_config, temp_output_dir):
         """Test downloading when HTTP error occurs"""
         mock_config.SAVE_IMAGES = True
-        mock_config.IMAGE_DOWNLOAD_DELAY = 0.0
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
         
         downloader = ImageDownloader(temp_output_dir)
         
@@ -263,13 +370,90 @@ class TestImageDownloaderDownload:
         # Should not have images_local
         assert "images_local" not in listing
     
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
+    async def test_download_listing_images_skips_non_image_response(self, mock_session_class, mock_config, temp_output_dir):
+        """Test that an HTML page served with HTTP 200 is not saved as an image"""
+        mock_config.SAVE_IMAGES = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        downloader = ImageDownloader(temp_output_dir)
+        
+        listing = {
+            "url": "https://example.com/imovel/id-123456/",
+            "images": ["https://example.com/img1.jpg"]
+        }
+        
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.content_type = "text/html"
+        mock_response.content_length = 512
+        
+        class MockResponseContext:
+            def __init__(self, response):
+                self.response = response
+            async def __aenter__(self):
+                return self.response
+            async def __aexit__(self, *args):
+                return None
+        
+        mock_session = Mock()
+        mock_session.get = Mock(return_value=MockResponseContext(mock_response))
+        mock_session_class.return_value = mock_session
+        
+        await downloader.download_listing_images(listing)
+        
+        assert "images_local" not in listing
+        mock_response.read.assert_not_called()
+        assert list((downloader.images_dir / "listing_123456").iterdir()) == []
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.image_downloader.Config')
+    @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
+    @pytest.mark.parametrize("content_type", ["binary/octet-stream", "application/octet-stream", ""])
+    async def test_download_listing_images_keeps_generic_binary_response(self, mock_session_class, mock_config, content_type, temp_output_dir):
+        """Test that generic binary and untyped responses are saved as images"""
+        mock_config.SAVE_IMAGES = True
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        
+        downloader = ImageDownloader(temp_output_dir)
+        
+        listing = {
+            "url": "https://example.com/imovel/id-123456/",
+            "images": ["https://example.com/img1.jpg"]
+        }
+        
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.content_type = content_type
+        mock_response.content_length = len(b"image_data")
+        mock_response.read = AsyncMock(return_value=b"image_data")
+        
+        class MockResponseContext:
+            def __init__(self, response):
+                self.response = response
+            async def __aenter__(self):
+                return self.response
+            async def __aexit__(self, *args):
+                return None
+        
+        mock_session = Mock()
+        mock_session.get = Mock(return_value=MockResponseContext(mock_response))
+        mock_session_class.return_value = mock_session
+        
+        await downloader.download_listing_images(listing)
+        
+        assert listing["images_local_count"] == 1
+        assert (temp_output_dir / listing["images_local"][0]).read_bytes() == b"image_data"
+    
     @pytest.mark.asyncio
     @patch('src.pipelines.image_downloader.Config')
     @patch('src.pipelines.image_downloader.aiohttp.ClientSession')
     async def test_download_listing_images_download_exception(self, mock_session_class, mock_config, temp_output_dir):
         """Test downloading when download raises exception"""
         mock_config.SAVE_IMAGES = True
-        mock_config.IMAGE_DOWNLOAD_DELAY = 0.0
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
         
         downloader = ImageDownloader(temp_output_dir)
         
@@ -332,4 +516,12 @@ class TestImageDownloaderDownload:
         
         result = downloader._normalize_images_list({})
         assert result == []
-
+    
+    @patch('src.pipelines.image_downloader.Config')
+    def test_rate_limiter_disabled_when_rate_is_zero(self, mock_config, temp_output_dir):
+        """Test that IMAGE_DOWNLOAD_RATE=0 disables rate limiting"""
+        mock_config.IMAGE_DOWNLOAD_RATE = 0
+        assert ImageDownloader(temp_output_dir)._rate_limiter is None
+        
+        mock_config.IMAGE_DOWNLOAD_RATE = 5
+        assert ImageDownloader(temp_output_dir)._rate_limiter.rate == 5
@@ -1,6 +1,7 @@
 """
 Tests for PipelineOrchestrator - Concurrency, modes, statistics
 """
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from pathlib import Path
@@ -195,20 +196,101 @@ class TestPipelineOrchestratorConcurrency:
         # Should handle exception and continue
         assert len(results) == 3  # 2 success + 1 error result
         assert orchestrator.stats["failed"] == 1
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
+    async def test_process_urls_with_concurrency_updates_stats_as_urls_finish(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
+        """Test that stats are updated per finished URL, not after the whole run"""
+        success_counts = []
+        
+        async def process_url(url, **kwargs):
+            success_counts.append(orchestrator.stats["success"])
+            return {"url": url}
+        
+        mock_process_url.side_effect = process_url
+        
+        orchestrator = PipelineOrchestrator(
+            urls=["https://example.com/1", "https://example.com/2", "https://example.com/3"],
+            output_dir=str(temp_output_dir),
+            max_concurrent=1,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        
+        await orchestrator._process_urls_with_concurrency()
+        
+        assert success_counts == [0, 1, 2]
+        assert orchestrator.stats["success"] == 3
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
+    async def test_process_urls_with_concurrency_reuses_pooled_browsers(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
+        """Test that URLs share at most max_concurrent browsers"""
+        mock_process_url.return_value = {"url": "test"}
+        
+        orchestrator = PipelineOrchestrator(
+            urls=[f"https://example.com/{i}" for i in range(5)],
+            output_dir=str(temp_output_dir),
+            max_concurrent=2,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        
+        await orchestrator._process_urls_with_concurrency()
+        
+        browser_managers = {id(call.kwargs["browser_manager"]) for call in mock_process_url.call_args_list}
+        assert mock_process_url.call_count == 5
+        assert len(browser_managers) <= 2
+        assert all(call.kwargs["reuse_browser"] for call in mock_process_url.call_args_list)
+    
+    @pytest.mark.asyncio
+    async def test_run_url_workers_bounds_concurrency_and_keeps_order(self, temp_output_dir, compliance_manager, human_behavior):
+        """Test that URL workers never exceed max_concurrent and results keep URL order"""
+        orchestrator = PipelineOrchestrator(
+            urls=[f"https://example.com/{i}" for i in range(7)],
+            output_dir=str(temp_output_dir),
+            max_concurrent=3,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        active = 0
+        peak = 0
+        
+        async def process(i, url):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Later URLs finish first
+            await asyncio.sleep(0.001 * (7 - i))
+            active -= 1
+            if i == 4:
+                raise ValueError("boom")
+            return url
+        
+        results = await orchestrator._run_url_workers(process)
+        
+        assert peak == 3
+        assert results[:4] == [f"https://example.com/{i}" for i in range(4)]
+        assert isinstance(results[4], ValueError)
+        assert results[5:] == ["https://example.com/5", "https://example.com/6"]
 
 
 class TestPipelineOrchestratorDeepSearchOnly:
     """Tests for deep_search_only mode"""
     
     @pytest.mark.asyncio
-    @patch('src.pipelines.pipeline_orchestrator.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
-    async def test_process_urls_with_single_browser(self, mock_process_url, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
-        """Test processing URLs with single browser in deep_search_only mode"""
+    async def test_process_listing_urls(self, mock_process_url, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
+        """Test processing URLs on pooled browsers in deep_search_only mode"""
         mock_process_url.return_value = {"url": "test"}
         
         # Mock browser manager
         mock_browser_manager = AsyncMock()
+        mock_browser_manager.needs_relaunch = False
         mock_browser_manager.initialize = AsyncMock()
         mock_browser_manager.close = AsyncMock()
         mock_browser_manager_class.return_value = mock_browser_manager
@@ -223,16 +305,16 @@ class TestPipelineOrchestratorDeepSearchOnly:
             deep_search_only=True
         )
         
-        results = await orchestrator._process_urls_with_single_browser()
+        results = await orchestrator._process_listing_urls()
         
         assert len(results) == 2
         mock_browser_manager.initialize.assert_called_once()
         mock_browser_manager.close.assert_called_once()
     
     @pytest.mark.asyncio
-    @patch('src.pipelines.pipeline_orchestrator.BrowserManager')
-    async def test_process_urls_with_single_browser_handles_init_error(self, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
-        """Test that single browser mode handles initialization errors"""
+    @patch('src.core.browser_pool.BrowserManager')
+    async def test_process_listing_urls_handles_init_error(self, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
+        """Test that deep search mode stops when the first browser fails to initialize"""
         # Mock browser manager that fails to initialize
         mock_browser_manager = AsyncMock()
         mock_browser_manager.initialize = AsyncMock(side_effect=Exception("Browser init failed"))
@@ -249,7 +331,81 @@ class TestPipelineOrchestratorDeepSearchOnly:
         )
         
         with pytest.raises(Exception):
-            await orchestrator._process_urls_with_single_browser()
+            await orchestrator._process_listing_urls()
+    
+    @pytest.mark.asyncio
+    @patch('src.core.browser_pool.BrowserManager')
+    async def test_process_listing_urls_respects_max_concurrent(self, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
+        """Test that deep search processes listings concurrently up to max_concurrent"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.needs_relaunch = False
+        mock_browser_manager_class.return_value = mock_browser_manager
+        
+        in_flight = 0
+        peak = 0
+        
+        async def fake_process_url(url, browser_manager=None, reuse_browser=False, prechecked=False):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"url": url}
+        
+        orchestrator = PipelineOrchestrator(
+            urls=[f"https://example.com/{i}" for i in range(6)],
+            output_dir=str(temp_output_dir),
+            max_concurrent=2,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior,
+            deep_search_only=True
+        )
+        
+        with patch.object(orchestrator.url_processor, 'process_url', side_effect=fake_process_url):
+            results = await orchestrator._process_listing_urls()
+        
+        assert len(results) == 6
+        assert peak == 2
+        assert orchestrator.stats["success"] == 6
+    
+    @pytest.mark.asyncio
+    @patch('src.core.browser_pool.BrowserManager')
+    async def test_process_listing_urls_relaunches_blocked_browser(self, mock_browser_manager_class, temp_output_dir, compliance_manager, human_behavior):
+        """Test that a browser blocked during deep search is replaced instead of reused"""
+        browsers = []
+        
+        def new_browser(*args, **kwargs):
+            browser = AsyncMock()
+            browser.needs_relaunch = False
+            browsers.append(browser)
+            return browser
+        
+        mock_browser_manager_class.side_effect = new_browser
+        used = []
+        
+        async def fake_process_url(url, browser_manager=None, reuse_browser=False, prechecked=False):
+            used.append(browser_manager)
+            if url.endswith("/0"):
+                browser_manager.needs_relaunch = True
+                return {"url": url, "error": "HTTP 403"}
+            return {"url": url}
+        
+        orchestrator = PipelineOrchestrator(
+            urls=[f"https://example.com/{i}" for i in range(2)],
+            output_dir=str(temp_output_dir),
+            max_concurrent=1,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior,
+            deep_search_only=True
+        )
+        
+        with patch.object(orchestrator.url_processor, 'process_url', side_effect=fake_process_url):
+            await orchestrator._process_listing_urls()
+        
+        assert used[0] is not used[1]
+        used[0].close.assert_called_once()
 
 
 class TestPipelineOrchestratorMainFlow:
@@ -277,7 +433,7 @@ class TestPipelineOrchestratorMainFlow:
         mock_process_concurrency.assert_called_once()
     
     @pytest.mark.asyncio
-    @patch('src.pipelines.pipeline_orchestrator.PipelineOrchestrator._process_urls_with_single_browser')
+    @patch('src.pipelines.pipeline_orchestrator.PipelineOrchestrator._process_listing_urls')
     async def test_process_urls_deep_search_only_mode(self, mock_process_single_browser, temp_output_dir, compliance_manager, human_behavior):
         """Test process_urls in deep_search_only mode"""
         mock_process_single_browser.return_value = [{"url": "test1"}]
@@ -297,6 +453,26 @@ class TestPipelineOrchestratorMainFlow:
         assert len(results) == 1
         mock_process_single_browser.assert_called_once()
     
+    @pytest.mark.asyncio
+    @patch('src.pipelines.pipeline_orchestrator.PipelineOrchestrator._process_urls_with_concurrency')
+    async def test_process_urls_skips_duplicate_urls(self, mock_process_concurrency, temp_output_dir, compliance_manager, human_behavior):
+        """Test that duplicate URLs are processed once, in order of first appearance"""
+        mock_process_concurrency.return_value = []
+        
+        orchestrator = PipelineOrchestrator(
+            urls=["https://example.com/2", "https://example.com/1", "https://example.com/2"],
+            output_dir=str(temp_output_dir),
+            max_concurrent=2,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        
+        await orchestrator.process_urls()
+        
+        assert orchestrator.urls == ["https://example.com/2", "https://example.com/1"]
+        assert orchestrator.stats["total"] == 2
+    
     @pytest.mark.asyncio
     @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
     async def test_process_urls_with_concurrency_handles_none_results(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
@@ -342,6 +518,7 @@ class TestPipelineOrchestratorMainFlow:
         
         # Call the callback directly
         await orchestrator.url_processor.save_callback(listing)
+        await orchestrator._finish_image_downloads()
         
         mock_download.assert_called_once_with(listing)
         mock_save.assert_called_once()
@@ -372,6 +549,40 @@ class TestPipelineOrchestratorMainFlow:
         
         mock_save.assert_called_once()
     
+    @pytest.mark.asyncio
+    @patch('src.pipelines.pipeline_orchestrator.Config.SAVE_IMAGES', True)
+    async def test_merge_and_save_downloads_images_in_background(self, temp_output_dir, compliance_manager, human_behavior):
+        """Test that the callback saves without waiting for images, and image paths are saved later"""
+        orchestrator = PipelineOrchestrator(
+            urls=[],
+            output_dir=str(temp_output_dir),
+            max_concurrent=2,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        url = "https://example.com/listing"
+        orchestrator._listings_cache = {url: {"url": url, "price": "100000"}}
+        release = asyncio.Event()
+        
+        async def download(listing):
+            await release.wait()
+            listing["images_local"] = ["images/listing/image_001.jpg"]
+            listing["images_local_count"] = 1
+        
+        with patch.object(orchestrator.image_downloader, 'download_listing_images', side_effect=download), \
+                patch.object(orchestrator.csv_storage, 'save_single_listing', new_callable=AsyncMock) as mock_save:
+            await orchestrator._merge_and_save({"url": url, "images": ["img1.jpg"], "area": "50"})
+            assert mock_save.call_count == 1
+            
+            release.set()
+            await orchestrator._finish_image_downloads()
+        
+        assert mock_save.call_count == 2
+        assert orchestrator._listings_cache[url]["area"] == "50"
+        assert orchestrator._listings_cache[url]["images_local_count"] == 1
+        assert orchestrator._image_workers == []
+    
     @pytest.mark.asyncio
     @patch('src.pipelines.pipeline_orchestrator.CSVStorageManager.save_page_listings')
     async def test_page_callback(self, mock_save_page, temp_output_dir, compliance_manager, human_behavior):
@@ -392,14 +603,62 @@ class TestPipelineOrchestratorMainFlow:
         
         mock_save_page.assert_called_once_with(1, listings)
     
+    @pytest.mark.asyncio
+    async def test_listings_cache_read_once(self, temp_output_dir, compliance_manager, human_behavior):
+        """Test that racing callbacks read the CSV once and page saves extend the cache"""
+        orchestrator = PipelineOrchestrator(
+            urls=[],
+            output_dir=str(temp_output_dir),
+            max_concurrent=1,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        existing = {"https://example.com/1": {"url": "https://example.com/1", "price": "100000"}}
+        
+        with patch.object(orchestrator.csv_storage, '_read_existing_data', return_value=(existing, [])) as mock_read:
+            caches = await asyncio.gather(*(orchestrator._get_listings_cache() for _ in range(3)))
+        
+        assert mock_read.call_count == 1
+        assert all(cache is existing for cache in caches)
+        
+        with patch.object(orchestrator.csv_storage, 'save_page_listings'):
+            await orchestrator.url_processor.page_callback(
+                2, [{"url": "https://example.com/2", "price": 200000}], "https://example.com"
+            )
+        
+        assert existing["https://example.com/2"] == {"url": "https://example.com/2", "price": 200000}
+    
+    @pytest.mark.asyncio
+    async def test_find_cache_key_matches_url_variants(self, temp_output_dir, compliance_manager, human_behavior):
+        """Test that cached listings are found despite case, query string and trailing slash"""
+        orchestrator = PipelineOrchestrator(
+            urls=[],
+            output_dir=str(temp_output_dir),
+            max_concurrent=1,
+            proxy_manager=None,
+            compliance_manager=compliance_manager,
+            human_behavior=human_behavior
+        )
+        cached_url = "https://www.zapimoveis.com.br/imovel/venda-apartamento-id-123/"
+        existing = {cached_url: {"url": cached_url}}
+        
+        with patch.object(orchestrator.csv_storage, '_read_existing_data', return_value=(existing, [])):
+            await orchestrator._get_listings_cache()
+        
+        assert orchestrator._find_cache_key(cached_url) == cached_url
+        assert orchestrator._find_cache_key(" https://www.zapimoveis.com.br/Imovel/venda-apartamento-id-123?source=ranking ") == cached_url
+        assert orchestrator._find_cache_key("https://www.zapimoveis.com.br/imovel/venda-casa-id-456/") is None
+    
     @pytest.mark.asyncio
     @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
-    async def test_process_urls_with_single_browser_handles_none_result(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
-        """Test single browser mode handles None results"""
+    async def test_process_listing_urls_handles_none_result(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
+        """Test deep search mode handles None results"""
         mock_process_url.return_value = None
         
-        with patch('src.pipelines.pipeline_orchestrator.BrowserManager') as mock_browser_class:
+        with patch('src.core.browser_pool.BrowserManager') as mock_browser_class:
             mock_browser = AsyncMock()
+            mock_browser.needs_relaunch = False
             mock_browser.initialize = AsyncMock()
             mock_browser.close = AsyncMock()
             mock_browser_class.return_value = mock_browser
@@ -414,7 +673,7 @@ class TestPipelineOrchestratorMainFlow:
                 deep_search_only=True
             )
             
-            results = await orchestrator._process_urls_with_single_browser()
+            results = await orchestrator._process_listing_urls()
             
             assert len(results) == 0
             assert orchestrator.stats["skipped"] == 1
@@ -436,12 +695,13 @@ class TestPipelineOrchestratorMainFlow:
     
     @pytest.mark.asyncio
     @patch('src.pipelines.pipeline_orchestrator.URLProcessor.process_url')
-    async def test_process_urls_with_single_browser_exception_handling(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
-        """Test single browser mode handles exceptions during processing"""
+    async def test_process_listing_urls_exception_handling(self, mock_process_url, temp_output_dir, compliance_manager, human_behavior):
+        """Test deep search mode handles exceptions during processing"""
         mock_process_url.side_effect = Exception("Processing error")
         
-        with patch('src.pipelines.pipeline_orchestrator.BrowserManager') as mock_browser_class:
+        with patch('src.core.browser_pool.BrowserManager') as mock_browser_class:
             mock_browser = AsyncMock()
+            mock_browser.needs_relaunch = False
             mock_browser.initialize = AsyncMock()
             mock_browser.close = AsyncMock()
             mock_browser_class.return_value = mock_browser
@@ -456,7 +716,7 @@ class TestPipelineOrchestratorMainFlow:
                 deep_search_only=True
             )
             
-            results = await orchestrator._process_urls_with_single_browser()
+            results = await orchestrator._process_listing_urls()
             
             # Should handle exception and add error result
             assert len(results) == 1
@@ -26,7 +26,7 @@ def temp_output_dir():
 class TestSystemE2E:
     """End-to-end system tests"""
     
-    @patch('src.pipelines.url_processor.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.url_processor.ZapImoveisService')
     @patch('src.config.Config')
     async def test_full_pipeline_search_url(self, mock_config, mock_service_class, mock_browser_manager_class, temp_output_dir):
@@ -73,7 +73,7 @@ class TestSystemE2E:
         assert results[0]["type"] == "search_results"
         assert len(results[0]["listings"]) == 2
     
-    @patch('src.pipelines.url_processor.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.url_processor.ZapImoveisService')
     @patch('src.config.Config')
     async def test_full_pipeline_listing_url(self, mock_config, mock_service_class, mock_browser_manager_class, temp_output_dir):
@@ -116,7 +116,7 @@ class TestSystemE2E:
         assert len(results) == 1
         assert results[0]["url"] == "https://example.com/listing"
     
-    @patch('src.pipelines.url_processor.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.url_processor.ZapImoveisService')
     @patch('src.config.Config')
     async def test_pipeline_with_proxy_rotation(self, mock_config, mock_service_class, mock_browser_manager_class, temp_output_dir):
@@ -162,7 +162,7 @@ class TestSystemE2E:
         assert len(results) == 1
         mock_browser_manager.mark_proxy_success.assert_called()
     
-    @patch('src.pipelines.url_processor.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.url_processor.ZapImoveisService')
     @patch('src.config.Config')
     async def test_pipeline_concurrency(self, mock_config, mock_service_class, mock_browser_manager_class, temp_output_dir):
@@ -207,7 +207,7 @@ class TestSystemE2E:
         assert len(results) == 3
         assert pipeline.stats["total"] == 3
     
-    @patch('src.pipelines.url_processor.BrowserManager')
+    @patch('src.core.browser_pool.BrowserManager')
     @patch('src.pipelines.url_processor.ZapImoveisService')
     @patch('src.config.Config')
     async def test_pipeline_csv_output(self, mock_config, mock_service_class, mock_browser_manager_class, temp_output_dir):
@@ -65,6 +65,31 @@ class TestURLProcessorHelpers:
         assert processor.is_search_url("https://example.com/venda/") is True
         assert processor.is_search_url("https://example.com/imovel/123") is False
     
+    @pytest.mark.asyncio
+    async def test_filter_compliant(self, compliance_manager, human_behavior):
+        """Test that private and robots-disallowed URLs are dropped, keeping order"""
+        processor = URLProcessor(compliance_manager, human_behavior)
+        urls = [
+            "https://example.com/venda/1",
+            "https://other.example.org/blocked",
+            "https://example.com/login",
+            "https://other.example.org/venda/2",
+            "https://example.com/venda/3"
+        ]
+        
+        async def can_fetch(url, user_agent):
+            return not url.endswith("/blocked")
+        
+        with patch.object(compliance_manager, 'can_fetch', side_effect=can_fetch) as mock_can_fetch:
+            result = await processor.filter_compliant(urls)
+        
+        assert result == [
+            "https://example.com/venda/1",
+            "https://other.example.org/venda/2",
+            "https://example.com/venda/3"
+        ]
+        assert mock_can_fetch.call_count == 4
+    
     def test_is_blocked_error(self, compliance_manager, human_behavior):
         """Test blocked error detection"""
         processor = URLProcessor(compliance_manager, human_behavior)
@@ -73,18 +98,21 @@ class TestURLProcessorHelpers:
         assert processor.is_blocked_error({"error": "429 Too Many Requests"}) is True
         assert processor.is_blocked_error({"error": "500 Internal Server Error"}) is False
         assert processor.is_blocked_error({"error": "Network timeout"}) is False
+        assert processor.is_blocked_error({"error": "HTTP 429"}) is True
+        assert processor.is_blocked_error({"error": "Timeout on request 40391"}) is False
+        assert processor.is_blocked_error({"error": "connect to 10.0.0.1:4290 failed"}) is False
     
     def test_calculate_retry_delay(self, compliance_manager, human_behavior):
         """Test retry delay calculation"""
         processor = URLProcessor(compliance_manager, human_behavior)
         
-        delay1 = processor.calculate_retry_delay(0)
-        delay2 = processor.calculate_retry_delay(1)
-        delay3 = processor.calculate_retry_delay(2)
-        
-        # Should increase exponentially
-        assert delay2 > delay1
-        assert delay3 > delay2
+        for attempt in range(3):
+            backoff = Config.RETRY_DELAY * (Config.RETRY_BACKOFF ** attempt)
+            delays = [processor.calculate_retry_delay(attempt) for _ in range(20)]
+            
+            # Jittered within the upper half of the exponential backoff
+            assert all(backoff / 2 <= delay <= backoff for delay in delays)
+            assert len(set(delays)) > 1
 
 
 class TestURLProcessorCompliance:
@@ -227,6 +255,53 @@ class TestURLProcessorErrorHandling:
         
         mock_browser_manager.mark_proxy_failure.assert_called_once()
         mock_browser_manager.rotate_fingerprint.assert_called_once()
+        assert mock_browser_manager.needs_relaunch is True
+    
+    @pytest.mark.asyncio
+    async def test_handle_blocked_error_honors_retry_after(self, compliance_manager, human_behavior):
+        """Test that a Retry-After delays the next request to the same host only"""
+        processor = URLProcessor(compliance_manager, human_behavior)
+        
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.rotate_fingerprint = Mock()
+        
+        await processor.handle_blocked_error(
+            "https://example.com/page",
+            {"error": "HTTP 429", "retry_after": 30.0},
+            mock_browser_manager
+        )
+        
+        with patch('src.pipelines.url_processor.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            await processor.wait_for_host("https://example.com/other")
+            await processor.wait_for_host("https://other.example.org/page")
+        
+        mock_sleep.assert_called_once()
+        assert 29 < mock_sleep.call_args.args[0] <= 30
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.url_processor.Config')
+    async def test_wait_for_host_shares_rate_limiter_per_host(self, mock_config, compliance_manager, human_behavior):
+        """Test that requests to one host share a token bucket and other hosts get their own"""
+        mock_config.HOST_REQUESTS_PER_SECOND = 2.0
+        processor = URLProcessor(compliance_manager, human_behavior)
+        
+        await processor.wait_for_host("https://example.com/a")
+        await processor.wait_for_host("https://example.com/b")
+        await processor.wait_for_host("https://other.example.org/a")
+        
+        assert set(processor._host_limiters) == {"example.com", "other.example.org"}
+        assert processor._host_limiters["example.com"].rate == 2.0
+    
+    @pytest.mark.asyncio
+    @patch('src.pipelines.url_processor.Config')
+    async def test_wait_for_host_without_rate_limit(self, mock_config, compliance_manager, human_behavior):
+        """Test that a zero HOST_REQUESTS_PER_SECOND disables per-host pacing"""
+        mock_config.HOST_REQUESTS_PER_SECOND = 0
+        processor = URLProcessor(compliance_manager, human_behavior)
+        
+        await processor.wait_for_host("https://example.com/a")
+        
+        assert processor._host_limiters == {}
     
     @pytest.mark.asyncio
     @patch('src.pipelines.url_processor.URLProcessor.attempt_scrape')
@@ -316,6 +391,27 @@ class TestURLProcessorFullFlow:
         
         assert result is None
     
+    @pytest.mark.asyncio
+    @patch('src.pipelines.url_processor.URLProcessor.check_compliance')
+    @patch('src.pipelines.url_processor.URLProcessor.process_scrape_attempt')
+    async def test_process_url_prechecked_only_waits_for_rate_limit(self, mock_process_attempt, mock_check_compliance, compliance_manager, human_behavior):
+        """Test that a URL already filtered for compliance only awaits the rate limit"""
+        processor = URLProcessor(compliance_manager, human_behavior)
+        mock_process_attempt.return_value = {"url": "https://example.com/listing"}
+        browser_manager = AsyncMock()
+        
+        with patch.object(compliance_manager, 'wait_for_rate_limit', new_callable=AsyncMock) as mock_wait:
+            result = await processor.process_url(
+                "https://example.com/listing",
+                browser_manager=browser_manager,
+                reuse_browser=True,
+                prechecked=True
+            )
+        
+        assert result == {"url": "https://example.com/listing"}
+        mock_check_compliance.assert_not_called()
+        mock_wait.assert_awaited_once_with("https://example.com/listing")
+    
     @pytest.mark.asyncio
     @patch('src.pipelines.url_processor.BrowserManager')
     @patch('src.pipelines.url_processor.URLProcessor.check_compliance')
@@ -5,7 +5,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 
-from src.services.zap_imoveis_service import ZapImoveisService
+from src.services.zap_imoveis_service import ZapImoveisService, parse_retry_after, MAX_RETRY_AFTER
 from src.core.human_behavior import HumanBehavior
 
 
@@ -50,6 +50,48 @@ class TestMainScraping:
         assert "error" in result
         assert result["url"] == "https://www.zapimoveis.com.br/imovel/test/"
     
+    @patch('src.services.zap_imoveis_service.Config')
+    async def test_scrape_listing_rate_limited(self, mock_config, mock_page, mock_human_behavior):
+        """Test that a 429 is reported with the requested wait instead of extracted"""
+        mock_config.NAVIGATION_TIMEOUT = 30000
+        
+        service = ZapImoveisService(mock_page, mock_human_behavior)
+        response = MagicMock(status=429, headers={"retry-after": "12"})
+        mock_page.goto = AsyncMock(return_value=response)
+        mock_page.query_selector = AsyncMock(return_value=None)
+        
+        result = await service.scrape_listing("https://www.zapimoveis.com.br/imovel/test/")
+        
+        assert result == {
+            "url": "https://www.zapimoveis.com.br/imovel/test/",
+            "error": "HTTP 429",
+            "retry_after": 12.0
+        }
+        mock_page.query_selector.assert_not_called()
+    
+    @patch('src.services.zap_imoveis_service.Config')
+    async def test_scrape_listing_awaits_before_navigation(self, mock_config, mock_page, mock_human_behavior):
+        """Test that the before_navigation hook runs before the page is requested"""
+        mock_config.NAVIGATION_TIMEOUT = 30000
+        calls = []
+        
+        async def before_navigation(url):
+            calls.append(("before", url))
+        
+        async def goto(url, **kwargs):
+            calls.append(("goto", url))
+            return MagicMock(status=429, headers={})
+        
+        service = ZapImoveisService(mock_page, mock_human_behavior, before_navigation=before_navigation)
+        mock_page.goto = AsyncMock(side_effect=goto)
+        
+        await service.scrape_listing("https://www.zapimoveis.com.br/imovel/test/")
+        
+        assert calls == [
+            ("before", "https://www.zapimoveis.com.br/imovel/test/"),
+            ("goto", "https://www.zapimoveis.com.br/imovel/test/")
+        ]
+    
     @patch('src.services.zap_imoveis_service.Config')
     async def test_wait_for_page_load_with_human_behavior(self, mock_config, mock_page, mock_human_behavior):
         """Test wait_for_page_load with human behavior enabled"""
@@ -69,3 +111,19 @@ class TestMainScraping:
         mock_page.wait_for_load_state.assert_called_once_with("networkidle")
 
 
+class TestParseRetryAfter:
+    """Tests for rate-limit header parsing"""
+    
+    def test_delta_seconds(self):
+        assert parse_retry_after({"retry-after": "30"}) == 30.0
+    
+    def test_http_date(self):
+        assert 0 <= parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) <= 1
+    
+    def test_ratelimit_reset_delta_and_cap(self):
+        assert parse_retry_after({"x-ratelimit-reset": "5"}) == 5.0
+        assert parse_retry_after({"x-ratelimit-reset": "100000"}) == MAX_RETRY_AFTER
+    
+    def test_missing_or_invalid(self):
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"retry-after": "soon"}) is None